@@ -34,7 +34,8 @@ options:
     default: 5
   api_retry_max_delay:
     description:
-      - Retry backoff delay in seconds is exponential up to this max. value, in seconds.
+      - Retry backoff delay in seconds is a randomized, decorrelated jitter growing up to this max. value, in seconds.
+      - A delay requested by the API with a C(Retry-After) or rate limit reset header takes precedence, up to I(api_timeout).
       - Fallback environment variable C(VULTR_API_RETRY_MAX_DELAY).
     type: int
     default: 12
@@ -43,8 +44,11 @@ options:
       - When receiving large numbers of resources, specify how many results should be returned per call to API.
       - This does not determine how many results are returned; all resources are returned according to other filters.
       - Vultr API maximum is 500.
+      - With C(auto) (added in version 1.15.0), listings are fetched in pages of the API maximum and lookups filtered by the API, e.g. by label,
+        in small pages. The page size is lowered for endpoints returning large resources, learned from the responses during the run,
+        to keep a page within a few MiB.
       - Fallback environment variable C(VULTR_API_RESULTS_PER_PAGE).
-    type: int
+    type: raw
     default: 100
     version_added: 1.14.0
   api_endpoint:
@@ -53,6 +57,44 @@ options:
       - Fallback environment variable C(VULTR_API_ENDPOINT).
     type: str
     default: https://api.vultr.com/v2
+  api_conditional_requests:
+    description:
+      - Revalidate repeated reads of the same URL by conditional requests.
+      - The ETag and Last-Modified validators of responses are kept per module run and sent
+        as C(If-None-Match) and C(If-Modified-Since), a C(304 Not Modified) response reuses the previous body.
+      - Only reduces the transferred bytes where the API sends validators.
+      - Only used by modules.
+      - Fallback environment variable C(VULTR_API_CONDITIONAL_REQUESTS).
+    type: bool
+    default: false
+    version_added: 1.15.0
+  api_rate_limit:
+    description:
+      - Max. amount of API requests per second, to stay below the rate limit of the Vultr API instead of retrying on 429 Too Many Requests.
+      - The limit is shared by all processes using the same API key on a host, e.g. forks of a play.
+      - C(0) disables the client side rate limit, negative values are rejected.
+      - Fallback environment variable C(VULTR_API_RATE_LIMIT).
+    type: float
+    default: 0
+    version_added: 1.15.0
+  api_cache_ttl:
+    description:
+      - Time in seconds rarely changing collections (OS, plans, regions and applications) are cached on disk.
+      - The cache is shared by all modules and forks running on the same host.
+      - C(0) disables the cache.
+      - Only used by modules, the inventory plugin has its own cache options.
+      - Fallback environment variable C(VULTR_API_CACHE_TTL).
+    type: int
+    default: 0
+    version_added: 1.15.0
+  api_cache_dir:
+    description:
+      - Directory used for the cache enabled by I(api_cache_ttl).
+      - The inventory plugin keeps the copy of its cache used by I(cache_max_staleness) there.
+      - Fallback environment variable C(VULTR_API_CACHE_DIR).
+    type: path
+    default: ~/.ansible/cache/vultr
+    version_added: 1.15.0
   validate_certs:
     description:
       - Validate SSL certs of the Vultr API.
@@ -60,4 +102,6 @@ options:
     default: true
 notes:
   - Also see the API documentation on U(https://www.vultr.com/api/).
+  - Requests are sent over reused keep-alive connections, unless a proxy is set by the C(http_proxy), C(https_proxy)
+    or C(all_proxy) environment variables and the API endpoint is not excluded by C(no_proxy).
 """
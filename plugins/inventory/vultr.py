@@ -29,6 +29,55 @@ extends_documentation_fragment:
   - inventory_cache
   - vultr.cloud.vultr_v2
 options:
+  accounts:
+    description:
+      - List of Vultr accounts queried and merged into one inventory.
+      - The accounts are queried concurrently, at most I(accounts_parallelism) at once.
+      - Every host is added to the group of its account and the account name is added as host variable C(account)
+        prefixed by I(variable_prefix), e.g. C(vultr_account).
+      - Hostnames already used by an instance of a previous account are suffixed by C(_) and the account name.
+      - If not set, the account of I(api_key) is queried.
+    type: list
+    elements: dict
+    version_added: 1.15.0
+    suboptions:
+      name:
+        description:
+          - Name of the account.
+        type: str
+        required: true
+      api_key:
+        description:
+          - API key of the account.
+          - Defaults to I(api_key).
+        type: str
+      api_endpoint:
+        description:
+          - URL to API endpoint of the account.
+          - Defaults to I(api_endpoint).
+        type: str
+      host_prefix:
+        description:
+          - Prefix of the hostnames of the account.
+        type: str
+        default: ''
+      group:
+        description:
+          - Group the hosts of the account are added to.
+          - Defaults to I(name).
+        type: str
+  accounts_parallelism:
+    description:
+      - Amount of I(accounts) queried concurrently.
+    type: int
+    default: 4
+    version_added: 1.15.0
+  api_key:
+    description:
+      - API key of the Vultr API.
+      - Required unless all I(accounts) have an API key.
+    type: str
+    required: false
   attributes:
     description:
       - Instance attributes to add as host variables to each host added to inventory.
@@ -46,6 +95,55 @@ options:
       - v6_main_ip
       - tags
       - internal_ip
+  cache_compression:
+    description:
+      - Compress the instances stored in the inventory cache.
+      - The instances are always stored in a compact format, storing the attribute names once.
+      - Only used if I(cache) is enabled.
+    type: bool
+    default: false
+    version_added: 1.15.0
+  cache_max_staleness:
+    description:
+      - Time in seconds an expired inventory cache may still be used.
+      - If the cache expired less than I(cache_max_staleness) seconds ago, the cached instances are used
+        and the cache is refreshed by a detached C(ansible-inventory) process, so the run does not wait for the API.
+      - A copy of the cache is kept in the directory set by I(api_cache_dir) for this purpose,
+        the output of the refresh is logged next to it and a failed refresh is reported by the next run.
+      - C(0) disables serving stale caches.
+      - Only used if I(cache) is enabled.
+    type: int
+    default: 0
+    version_added: 1.15.0
+  cache_incremental:
+    description:
+      - Keep the host variables and groups computed for every instance on disk, in the directory set by I(api_cache_dir).
+      - On the next run, filters, I(compose), I(groups) and I(keyed_groups) are only evaluated for instances
+        which were added or changed since, all others are added as before.
+      - Templates must only depend on the instance attributes, the stored results are not used if I(use_extra_vars) is enabled.
+      - Changing the configuration of the plugin discards the stored results.
+    type: bool
+    default: false
+    version_added: 1.15.0
+  enrichments:
+    description:
+      - Additional data added as host variables, prefixed by I(variable_prefix).
+      - Every source is queried once per account and joined to the instances by ID, instead of querying it per host.
+      - C(blocks) adds the list of attached block storages, queried from C(/blocks).
+      - C(firewall_group) adds the firewall group, queried from C(/firewalls).
+      - C(vpcs) adds the list of VPCs the internal IP of the instance is part of, queried from C(/vpcs).
+        Requires the I(internal_ip) of the instances, it is only set if the instance has a private network.
+      - C(vpc2s) adds the list of attached VPC 2.0 networks including the IP address of the instance,
+        queried from C(/vpc2) and the nodes of each VPC 2.0 network.
+    type: list
+    elements: str
+    default: []
+    choices:
+      - blocks
+      - firewall_group
+      - vpcs
+      - vpc2s
+    version_added: 1.15.0
   filters:
     description:
       - Filter hosts with Jinja2 templates.
@@ -56,8 +154,12 @@ options:
   instance_type:
     description:
       - Type of instance.
-    type: str
-    default: cloud
+      - Since version 1.15.0, a list of types is accepted, fetched concurrently and merged into one inventory.
+      - The type is added as host variable C(instance_type) prefixed by I(variable_prefix), e.g. C(vultr_instance_type).
+    type: list
+    elements: str
+    default:
+      - cloud
     choices:
       - cloud
       - bare_metal
@@ -124,29 +226,118 @@ compose:
 # Querying the bare metal instances
 plugin: vultr.cloud.vultr
 instance_type: bare_metal
+
+# Use the cache and refresh it in the background once expired,
+# serving the cached instances for up to a day meanwhile
+plugin: vultr.cloud.vultr
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: ~/.ansible/cache/vultr_inventory
+cache_timeout: 300
+cache_max_staleness: 86400
+
+# Adding the attached block storages and the firewall group,
+# grouped by firewall group
+plugin: vultr.cloud.vultr
+enrichments:
+  - blocks
+  - firewall_group
+keyed_groups:
+  - key: vultr_firewall_group.description | default("none")
+    prefix: firewall
+
+# Querying multiple accounts, grouped by account
+plugin: vultr.cloud.vultr
+accounts:
+  - name: production
+    api_key: '{{ lookup("env", "VULTR_API_KEY_PRODUCTION") }}'
+  - name: staging
+    api_key: '{{ lookup("env", "VULTR_API_KEY_STAGING") }}'
+    host_prefix: staging-
+
+# Querying cloud and bare metal instances, grouped by type
+plugin: vultr.cloud.vultr
+instance_type:
+  - cloud
+  - bare_metal
+keyed_groups:
+  - key: vultr_instance_type
+    prefix: type
 """
 
 RETURN = r""" # """
 
+import copy
+import errno
+import hashlib
+import ipaddress
 import json
+import os
+import re
+import subprocess
+import sys
+import time
+import zlib
 
 from ansible.errors import AnsibleError, AnsibleParserError
-from ansible.module_utils._text import to_native
+from ansible.module_utils._text import to_bytes, to_native, to_text
+from ansible.module_utils.six import PY3, string_types
+from ansible.module_utils.common.process import get_bin_path
 from ansible.module_utils.six.moves.urllib.error import HTTPError, URLError
 from ansible.module_utils.urls import Request
 from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+
+    HAS_THREAD_POOL = True
+except ImportError:
+    HAS_THREAD_POOL = False
+
 try:
     from ansible.template import trust_as_template
 except ImportError:
     trust_as_template = None
 
-from ..module_utils.vultr_v2 import VULTR_USER_AGENT
+
+from ..module_utils.content_encoding import ACCEPT_ENCODING, read_body
+from ..module_utils.lookup_cache import VultrLookupCache
+from ..module_utils.rate_limit import VultrRateLimiter
+from ..module_utils.records import is_packed_records, pack_records, unpack_records
+from ..module_utils.vultr_v2 import VULTR_USER_AGENT, VultrPageSizer
+
+
+# The cursor of the next page in the meta links, e.g. "next": "bmV4dF9fQ0FFRDQ3"
+NEXT_CURSOR_RE = re.compile(r'"next"\s*:\s*"([^"\\]*)"')
+
+# Simple host filters evaluated without templating,
+# e.g. vultr_plan == "vc2-1c-1gb" or "web" not in vultr_tags
+FILTER_LITERAL = r"""(?P<{0}>"[^"\\]*"|'[^'\\]*'|-?\d+)"""
+FILTER_VARIABLE = r"(?P<{0}>[A-Za-z_][A-Za-z0-9_]*)"
+FILTER_COMPARE_RE = re.compile(r"^\s*{0}\s*(?P<op>==|!=)\s*{1}\s*$".format(FILTER_VARIABLE.format("var"), FILTER_LITERAL.format("literal")))
+FILTER_CONTAINS_RE = re.compile(r"^\s*{0}\s+(?P<op>in|not\s+in)\s+{1}\s*$".format(FILTER_LITERAL.format("literal"), FILTER_VARIABLE.format("var")))
 
 
 class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
 
     NAME = "vultr.cloud.vultr"
+    # Time in seconds the computed host states are kept for cache_incremental
+    HOST_STATES_TTL = 7 * 24 * 3600
+
+    # Set to the cache key for the ansible-inventory process refreshing a stale cache
+    REFRESH_ENV = "VULTR_INVENTORY_REFRESH"
+    # Time in seconds after which a running refresh is considered hung
+    REFRESH_TIMEOUT = 900
+
+    # Account of the instances queried, see _get_account_instances()
+    _account = None
+
+    # Join indexes of the enrichments, see _get_enrichment_data()
+    _enrichment_data = None
+
+    # Set by InventoryData.add_host(), not by _populate()
+    SOURCE_VARIABLES = ("inventory_file", "inventory_dir")
+
     RESOURCES_PER_TYPE = {
         "cloud": {
             "resource": "instances",
@@ -158,19 +349,77 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         },
     }
 
-    def _get_instances(self):
-        instances = []
-        api_key = self.get_option("api_key")
+    # Sources of the enrichments, joined to the instances by _join_enrichments()
+    ENRICHMENTS = {
+        "blocks": {
+            "resource": "blocks",
+            "response": "blocks",
+        },
+        "firewall_group": {
+            "resource": "firewalls",
+            "response": "firewall_groups",
+        },
+        "vpcs": {
+            "resource": "vpcs",
+            "response": "vpcs",
+        },
+        "vpc2s": {
+            "resource": "vpc2",
+            "response": "vpcs",
+        },
+    }
+
+    def _get_instance_types(self):
+        instance_types = self.get_option("instance_type") or ["cloud"]
+        if isinstance(instance_types, string_types):
+            instance_types = [instance_types]
+        return instance_types
+
+    def _template_api_key(self, api_key):
+        if not api_key:
+            raise AnsibleParserError("Missing required option api_key.")
+
         if trust_as_template:
             api_key = trust_as_template(api_key)
 
         if self.templar.is_template(api_key):
             api_key = self.templar.template(api_key)
+        return api_key
+
+    def _get_accounts(self):
+        accounts = []
+        for account in self.get_option("accounts") or []:
+            if not isinstance(account, dict) or not account.get("name"):
+                raise AnsibleParserError("Every account in accounts requires a name.")
+
+            accounts.append(
+                {
+                    "name": account["name"],
+                    "api_key": account.get("api_key") or self.get_option("api_key"),
+                    "api_endpoint": account.get("api_endpoint") or self.get_option("api_endpoint"),
+                    "host_prefix": account.get("host_prefix") or "",
+                    "group": account.get("group") or account["name"],
+                }
+            )
+        return accounts
+
+    def _get_api_endpoint(self):
+        if self._account is not None:
+            return self._account["api_endpoint"]
+        return self.get_option("api_endpoint")
+
+    def _setup_request(self):
+        if self._account is not None:
+            # Templated before being queried concurrently
+            api_key = self._account["api_key"]
+        else:
+            api_key = self._template_api_key(self.get_option("api_key"))
 
         headers = {
             "Content-Type": "application/json",
             "User-Agent": VULTR_USER_AGENT,
             "Authorization": "Bearer {0}".format(api_key),
+            "Accept-Encoding": ACCEPT_ENCODING,
         }
 
         self.req = Request(
@@ -179,42 +428,382 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             validate_certs=self.get_option("validate_certs"),  # type: ignore
         )
 
-        instance_type_config = self.get_option("instance_type") or "cloud"
-        self.display.vvv("Type is: {0}".format(instance_type_config))
+        self.rate_limiter = None
+        if (self.get_option("api_rate_limit") or 0) < 0:
+            raise AnsibleError("api_rate_limit must be 0 or greater, got: {0}".format(to_native(self.get_option("api_rate_limit"))))
+        if self.get_option("api_rate_limit"):
+            self.rate_limiter = VultrRateLimiter(
+                rate=self.get_option("api_rate_limit"),
+                api_endpoint=self._get_api_endpoint(),
+                api_key=api_key,
+            )
+
+    def _get_instances(self):
+        instances = []
+        for page in self._get_instance_pages():
+            instances.extend(page)
+        return instances
+
+    def _get_account_instances(self, account):
+        # A shallow copy with its own request and rate limiter per account
+        account_inventory = copy.copy(self)
+        account_inventory._account = account
+        return account_inventory._get_instances()
+
+    def _get_account_pages(self, accounts):
+        """
+        Generator yielding the projected instances account by account.
+
+        The accounts are queried concurrently, bounded by accounts_parallelism.
+        """
+        for account in accounts:
+            account["api_key"] = self._template_api_key(account["api_key"])
+
+        if len(accounts) == 1 or not HAS_THREAD_POOL:
+            for account in accounts:
+                yield self._get_account_instances(account)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(self.get_option("accounts_parallelism") or 4, len(accounts)))
+        try:
+            futures = [executor.submit(self._get_account_instances, account) for account in accounts]
+            for future in futures:
+                yield future.result()
+        finally:
+            executor.shutdown(wait=False)
 
-        instance_type = self.RESOURCES_PER_TYPE[instance_type_config]
+    def _get_instance_pages(self):
+        """
+        Generator yielding the projected instances of all instance types page by page.
 
+        The first type is streamed, further types are fetched concurrently
+        in the background and yielded afterwards.
+        """
+        if self._account is None:
+            accounts = self._get_accounts()
+            if accounts:
+                for page in self._get_account_pages(accounts):
+                    yield page
+                return
+
+        self._setup_request()
+        self._enrichment_data = self._get_enrichment_data()
+
+        instance_types = self._get_instance_types()
+        self.display.vvv("Types are: {0}".format(", ".join(instance_types)))
+
+        executor = None
+        futures = []
+        if len(instance_types) > 1 and HAS_THREAD_POOL:
+            executor = ThreadPoolExecutor(max_workers=len(instance_types) - 1)
+            futures = [executor.submit(self._get_instances_by_type, instance_type) for instance_type in instance_types[1:]]
+
+        try:
+            for page in self._get_pages(instance_types[0]):
+                yield [self._project(instance, instance_types[0]) for instance in page]
+
+            if executor is not None:
+                for future in futures:
+                    yield future.result()
+            else:
+                for instance_type in instance_types[1:]:
+                    yield self._get_instances_by_type(instance_type)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def _project(self, instance, instance_type_config):
+        # Keep only what _populate() needs
+        attributes = self.get_option("attributes") or []
+        record = dict((k, v) for k, v in instance.items() if k in attributes or k in ("id", "label"))
+        record["instance_type"] = instance_type_config
+        if self._account is not None:
+            record["account"] = self._account["name"]
+        if self._enrichment_data:
+            self._join_enrichments(record, instance)
+        return record
+
+    def _get_enrichments(self):
+        return self.get_option("enrichments") or []
+
+    def _get_vpc2_nodes(self, vpc2):
+        nodes = []
+        for page in self._get_resource_pages("vpc2/{0}/nodes".format(vpc2["id"]), "nodes"):
+            nodes.extend(page)
+        return nodes
+
+    def _get_enrichment_source(self, enrichment):
+        resources = []
+        for page in self._get_resource_pages(**self.ENRICHMENTS[enrichment]):
+            resources.extend(page)
+
+        if enrichment == "blocks":
+            attached = dict()
+            for block in resources:
+                if block.get("attached_to_instance"):
+                    attached.setdefault(block["attached_to_instance"], []).append(block)
+            return attached
+
+        if enrichment == "firewall_group":
+            return dict((firewall_group["id"], firewall_group) for firewall_group in resources)
+
+        if enrichment == "vpcs":
+            networks = []
+            for vpc in resources:
+                try:
+                    networks.append((ipaddress.ip_network(u"{0}/{1}".format(vpc["v4_subnet"], vpc["v4_subnet_mask"]), strict=False), vpc))
+                except (KeyError, ValueError):
+                    continue
+            return networks
+
+        # VPC 2.0 networks, the nodes of each network are listed separately
+        attached = dict()
+        for vpc2 in resources:
+            for node in self._get_vpc2_nodes(vpc2):
+                attached.setdefault(node["id"], []).append(dict(vpc2, ip_address=node.get("ip_address")))
+        return attached
+
+    def _get_enrichment_data(self):
+        """
+        Queries each source of the enrichments once, returns the join indexes by enrichment.
+        """
+        enrichments = self._get_enrichments()
+        if not enrichments:
+            return dict()
+
+        self.display.vvv("Enrichments are: {0}".format(", ".join(enrichments)))
+        if len(enrichments) == 1 or not HAS_THREAD_POOL:
+            return dict((enrichment, self._get_enrichment_source(enrichment)) for enrichment in enrichments)
+
+        executor = ThreadPoolExecutor(max_workers=len(enrichments))
+        try:
+            futures = [(enrichment, executor.submit(self._get_enrichment_source, enrichment)) for enrichment in enrichments]
+            return dict((enrichment, future.result()) for enrichment, future in futures)
+        finally:
+            executor.shutdown(wait=False)
+
+    def _join_enrichments(self, record, instance):
+        for enrichment, data in self._enrichment_data.items():
+            if enrichment == "firewall_group":
+                record[enrichment] = data.get(instance.get("firewall_group_id"))
+            elif enrichment == "vpcs":
+                try:
+                    internal_ip = ipaddress.ip_address(to_text(instance.get("internal_ip") or ""))
+                    record[enrichment] = [vpc for network, vpc in data if internal_ip in network]
+                except ValueError:
+                    record[enrichment] = []
+            else:
+                record[enrichment] = data.get(instance.get("id"), [])
+
+    def _get_instances_by_type(self, instance_type_config):
+        instances = []
+        for page in self._get_pages(instance_type_config):
+            instances.extend(self._project(instance, instance_type_config) for instance in page)
+        return instances
+
+    def _fetch_page(self, req_url):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        self.display.vvv("Querying API: {0}".format(req_url))
+        resp = self.req.get(req_url)
+
+        # Gzip is decoded by Request on recent ansible-core versions already
+        encoding = resp.headers.get("content-encoding") if getattr(resp, "headers", None) is not None else None
+        if not encoding:
+            return to_text(resp.read())
+
+        try:
+            return to_text(read_body(resp, encoding)[0])
+        except zlib.error as e:
+            raise AnsibleError("Error decoding the {0} encoded API response: {1}".format(encoding, to_native(e)))
+
+    def _get_next_cursor(self, raw_page):
+        # Find the cursor in the meta links at the end of the page without decoding it
+        meta_index = raw_page.rfind('"meta"')
+        if meta_index == -1:
+            return None
+
+        match = NEXT_CURSOR_RE.search(raw_page, meta_index)
+        return match.group(1) if match else None
+
+    def _get_pages(self, instance_type_config):
+        """
+        Generator yielding the list of instances page by page.
+        """
+        return self._get_resource_pages(**self.RESOURCES_PER_TYPE[instance_type_config])
+
+    def _get_results_per_page(self):
+        results_per_page = self.get_option("api_results_per_page")
+        if results_per_page == "auto":
+            # Only listings are queried, the projected pages are not kept
+            return VultrPageSizer.MAX_PAGE_SIZE
+
+        try:
+            per_page = int(results_per_page)  # type: ignore
+        except (TypeError, ValueError):
+            per_page = 0
+        if per_page < 1:
+            raise AnsibleError("api_results_per_page must be a positive integer or auto, got: {0}".format(to_native(results_per_page)))
+        return per_page
+
+    def _get_resource_pages(self, resource, response):
+        """
+        Generator yielding the list of resources page by page.
+
+        The request of the next page is sent as soon as its cursor is found
+        in the raw page, while the current page is decoded and processed.
+        """
         api_endpoint = "{0}/{1}?per_page={2}".format(
-            self.get_option("api_endpoint"),
-            instance_type["resource"],  # type: ignore
-            self.get_option("api_results_per_page"),
+            self._get_api_endpoint(),
+            resource,
+            self._get_results_per_page(),
         )
 
-        cursor = ""
-        req_url = api_endpoint
+        executor = ThreadPoolExecutor(max_workers=1) if HAS_THREAD_POOL else None
         try:
+            raw_page = self._fetch_page(api_endpoint)
             while True:
-                self.display.vvv("Querying API: {0}".format(req_url))
+                prefetch = None
+                cursor = self._get_next_cursor(raw_page)
+                if cursor and executor is not None:
+                    prefetch = executor.submit(self._fetch_page, "{0}&cursor={1}".format(api_endpoint, cursor))
+
+                page = json.loads(raw_page)
+                raw_page = None
+
+                if page["meta"]["links"]["next"] != cursor:
+                    # The early found cursor was wrong, do not use the prefetched page
+                    cursor = page["meta"]["links"]["next"]
+                    prefetch = None
 
-                page = json.load(self.req.get(req_url))
-                instances.extend(page[instance_type["response"]])  # type: ignore
-                cursor = page["meta"]["links"]["next"]
+                yield page[response]
 
                 if cursor == "":
-                    return instances
+                    return
 
-                req_url = "{0}&cursor={1}".format(api_endpoint, cursor)
+                if prefetch is not None:
+                    raw_page = prefetch.result()
+                else:
+                    raw_page = self._fetch_page("{0}&cursor={1}".format(api_endpoint, cursor))
 
         except (KeyError, ValueError):
             raise AnsibleParserError("Unable to parse JSON response.")
         except (URLError, HTTPError) as err:
             raise AnsibleParserError(err)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def _get_fingerprint(self, value):
+        return hashlib.sha1(to_bytes(json.dumps(value, sort_keys=True, default=to_text))).hexdigest()
+
+    def _get_host_states_config(self):
+        # Everything the host variables and groups are computed from, besides the instances
+        accounts = [[account["name"], account["host_prefix"], account["group"]] for account in self._get_accounts()]
+        return self._get_fingerprint(
+            [accounts]
+            + [
+                self.get_option(option)
+                for option in (
+                    "attributes",
+                    "compose",
+                    "enrichments",
+                    "filters",
+                    "groups",
+                    "keyed_groups",
+                    "leading_separator",
+                    "strict",
+                    "variable_prefix",
+                )
+            ]
+        )
+
+    def _get_host_states_cache(self):
+        if not self.get_option("cache_incremental") or self.get_option("use_extra_vars"):
+            return None
 
-    def _populate(self, instances):
+        return VultrLookupCache(
+            cache_dir=os.path.join(self.get_option("api_cache_dir") or "~/.ansible/cache/vultr", "inventory"),
+            ttl=self.HOST_STATES_TTL,
+        )
+
+    def _load_host_states(self, host_states_cache, cache_key):
+        cached = host_states_cache.get(cache_key + "-hosts")
+        if isinstance(cached, dict) and cached.get("config") == self._get_host_states_config():
+            return cached.get("hosts") or dict()
+        return dict()
+
+    def _save_host_states(self, host_states_cache, cache_key, host_states):
+        host_states_cache.set(
+            cache_key + "-hosts",
+            {
+                "config": self._get_host_states_config(),
+                "hosts": host_states,
+            },
+        )
+
+    def _get_host_state(self, instance_label, fingerprint):
+        host = self.inventory.get_host(instance_label)  # type: ignore
+        group_edges = []
+        groups = [group for group in host.get_groups() if group.name not in ("all", "ungrouped")]
+        while groups:
+            group = groups.pop()
+            for parent in group.parent_groups:
+                if parent.name not in ("all", "ungrouped") and [parent.name, group.name] not in group_edges:
+                    group_edges.append([parent.name, group.name])
+                    groups.append(parent)
+
+        return {
+            "fingerprint": fingerprint,
+            "vars": dict((k, v) for k, v in host.vars.items() if k not in self.SOURCE_VARIABLES),
+            "groups": [group.name for group in host.get_groups() if group.name not in ("all", "ungrouped")],
+            "group_edges": group_edges,
+        }
+
+    def _restore_host_state(self, instance_label, host_state):
+        if host_state.get("excluded"):
+            self.display.vvv("Host {0} excluded by filters".format(instance_label))
+            return
+
+        self.inventory.add_host(instance_label)  # type: ignore
+        for var_name, var_val in host_state["vars"].items():
+            self.inventory.set_variable(instance_label, var_name, var_val)  # type: ignore
+
+        for parent, child in host_state["group_edges"]:
+            self.inventory.add_group(parent)  # type: ignore
+            self.inventory.add_group(child)  # type: ignore
+            self.inventory.add_child(parent, child)  # type: ignore
+
+        for group in host_state["groups"]:
+            self.inventory.add_group(group)  # type: ignore
+            self.inventory.add_child(group, instance_label)  # type: ignore
+
+    def _get_account_hostname(self, account, instance_label):
+        if getattr(self, "_account_hostnames", None) is None:
+            self._account_hostnames = dict()
+
+        hostname = account["host_prefix"] + instance_label
+        if self._account_hostnames.setdefault(hostname, account["name"]) != account["name"]:
+            # Used by an instance of a previous account
+            hostname = "{0}_{1}".format(hostname, account["name"])
+            self._account_hostnames.setdefault(hostname, account["name"])
+        return hostname
+
+    def _populate(self, instances, host_states=None, previous_host_states=None):
+        """
+        Adds the instances to the inventory.
+
+        If host_states is a dict, the computed host variables and groups are
+        stored in it by instance ID. Instances unchanged since they were stored
+        in previous_host_states are restored from there without templating.
+        """
         attributes = self.get_option("attributes")
-        host_filters = self.get_option("filters")
+        host_filters = self._get_host_filters()
         strict = self.get_option("strict")
         variable_prefix = self.get_option("variable_prefix")
+        extra_variables = ["instance_type", "account"] + self._get_enrichments()
+        accounts = dict((account["name"], account) for account in self._get_accounts())
 
         for instance in instances:
             instance_label = instance.get("label")
@@ -227,9 +816,22 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                 )
                 continue
 
+            account = accounts.get(instance.get("account"))
+            if account is not None:
+                instance_label = self._get_account_hostname(account, instance_label)
+
+            fingerprint = None
+            if host_states is not None:
+                fingerprint = self._get_fingerprint(instance)
+                host_state = (previous_host_states or dict()).get(instance.get("id"))
+                if host_state and host_state["fingerprint"] == fingerprint:
+                    self._restore_host_state(instance_label, host_state)
+                    host_states[instance.get("id")] = host_state
+                    continue
+
             host_variables = {}
             for k, v in instance.items():
-                if k in attributes:
+                if k in attributes or k in extra_variables:
                     host_variables["{0}{1}".format(variable_prefix, k)] = v
 
             if not self._passes_filters(
@@ -239,6 +841,8 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                 strict,  # type: ignore
             ):
                 self.display.vvv("Host {0} excluded by filters".format(instance_label))
+                if host_states is not None:
+                    host_states[instance.get("id")] = {"fingerprint": fingerprint, "excluded": True}
                 continue
 
             self.inventory.add_host(instance_label)  # type: ignore
@@ -246,6 +850,10 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             for var_name, var_val in host_variables.items():
                 self.inventory.set_variable(instance_label, var_name, var_val)  # type: ignore
 
+            if account is not None:
+                self.inventory.add_group(account["group"])  # type: ignore
+                self.inventory.add_child(account["group"], instance_label)  # type: ignore
+
             self._set_composite_vars(
                 self.get_option("compose"),
                 self.inventory.get_host(instance_label).get_vars(),  # type: ignore
@@ -267,11 +875,73 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                 strict,  # type: ignore
             )
 
+            if host_states is not None:
+                host_states[instance.get("id")] = self._get_host_state(instance_label, fingerprint)
+
+    def _get_host_filters(self):
+        """
+        Returns the configured filters compiled once per parse.
+
+        Each filter is a tuple of the template, trusted for templating, and
+        a function evaluating it without templating or None.
+        """
+        filters = self.get_option("filters")
+        if not filters or not isinstance(filters, list):
+            return []
+
+        compiled = getattr(self, "_compiled_filters", None)
+        if compiled is None or compiled[0] != filters:
+            compiled = (list(filters), [self._compile_filter(template) for template in filters])
+            self._compiled_filters = compiled
+        return compiled[1]
+
+    def _compile_filter(self, template):
+        fast_path = None
+
+        match = FILTER_COMPARE_RE.match(template) or FILTER_CONTAINS_RE.match(template)
+        if match:
+            var = match.group("var")
+            literal = match.group("literal")
+            literal = literal[1:-1] if literal[0] in "\"'" else int(literal)
+            negate = match.group("op") == "!=" or match.group("op").startswith("not")
+
+            if match.group("op") in ("==", "!="):
+
+                def fast_path(variables):
+                    value = variables[var]
+                    if not isinstance(value, (string_types, int, float, bool, type(None), list, dict)):
+                        raise TypeError
+                    return (value == literal) != negate
+
+            else:
+
+                def fast_path(variables):
+                    value = variables[var]
+                    if not isinstance(value, (string_types, list, dict)) or (isinstance(value, string_types) and not isinstance(literal, string_types)):
+                        raise TypeError
+                    return (literal in value) != negate
+
+        if trust_as_template:
+            template = trust_as_template(template)
+        return template, fast_path
+
     def _passes_filters(self, filters, variables, host, strict=False):
         if filters and isinstance(filters, list):
-            for template in filters:
-                if trust_as_template:
-                    template = trust_as_template(template)
+            for host_filter in filters:
+                if isinstance(host_filter, tuple):
+                    template, fast_path = host_filter
+                else:
+                    template, fast_path = self._compile_filter(host_filter)
+
+                if fast_path is not None:
+                    try:
+                        if not fast_path(variables):
+                            return False
+                        continue
+                    except (KeyError, TypeError):
+                        # Undefined or unusual values, let Jinja decide
+                        pass
+
                 try:
                     if not self._compose(template, variables):
                         return False
@@ -310,25 +980,193 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                 )
         return valid
 
+    def _load_cached_instances(self, cached):
+        # Raw instances cached by earlier versions
+        if isinstance(cached, list):
+            return cached
+
+        # Projected instances, unless projected to fewer attributes than configured or of other accounts
+        attributes = self.get_option("attributes") or []
+        accounts = [account["name"] for account in self._get_accounts()]
+        if (
+            isinstance(cached, dict)
+            and set(attributes).issubset(cached.get("attributes", []))
+            and set(self._get_enrichments()).issubset(cached.get("enrichments", []))
+            and cached.get("accounts", []) == accounts
+        ):
+            instances = cached.get("instances")
+            if is_packed_records(instances):
+                # Materialized host by host while populating
+                return unpack_records(instances)
+            return instances
+        return None
+
+    def _get_stale_cache(self):
+        max_staleness = self.get_option("cache_max_staleness")
+        if not self.get_option("cache") or not max_staleness:
+            return None
+
+        return VultrLookupCache(
+            cache_dir=os.path.join(self.get_option("api_cache_dir") or "~/.ansible/cache/vultr", "inventory"),
+            ttl=int(self.get_option("cache_timeout") or 0) + max_staleness,
+        )
+
+    def _get_cache_value(self, instances):
+        return {
+            "attributes": list(self.get_option("attributes") or []),
+            "accounts": [account["name"] for account in self._get_accounts()],
+            "enrichments": list(self._get_enrichments()),
+            "instances": pack_records(instances, compress=self.get_option("cache_compression")),
+        }
+
+    def _update_cache(self, cache_key, instances, stale_cache=None):
+        cache_value = self._get_cache_value(instances)
+        self._cache[cache_key] = cache_value
+        if stale_cache is not None:
+            stale_cache.set(cache_key, cache_value)
+
+    def _get_refresh_paths(self, cache_key, stale_cache):
+        lock_path = os.path.join(stale_cache.cache_dir, cache_key + ".lock")
+        log_path = os.path.join(stale_cache.cache_dir, cache_key + ".log")
+        return lock_path, log_path
+
+    def _is_refresh_running(self, lock_path, log_path):
+        try:
+            with open(lock_path) as f:
+                pid = f.read().strip()
+            started = os.stat(lock_path).st_mtime
+        except (IOError, OSError):
+            # Removed by the finished refresh
+            return False
+
+        if started + self.REFRESH_TIMEOUT < time.time():
+            self.display.warning("The background refresh of the inventory cache did not finish in {0}s, see {1}".format(self.REFRESH_TIMEOUT, log_path))
+            return False
+
+        if pid.isdigit():
+            try:
+                os.kill(int(pid), 0)
+            except OSError as e:
+                if e.errno == errno.ESRCH:
+                    # The lock is only left behind by a failed refresh
+                    self.display.warning("The background refresh of the inventory cache failed, see {0}".format(log_path))
+                    return False
+        return True
+
+    def _acquire_refresh_lock(self, lock_path, log_path):
+        if not os.path.isdir(os.path.dirname(lock_path)):
+            os.makedirs(os.path.dirname(lock_path), 0o700)
+
+        # Retried once after removing a lock left behind by a failed or hung refresh
+        for dummy in range(2):
+            try:
+                os.close(os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+                return True
+            except OSError as e:
+                if e.errno != errno.EEXIST or self._is_refresh_running(lock_path, log_path):
+                    return False
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+        return False
+
+    def _refresh_in_background(self, path, cache_key, stale_cache):
+        """
+        Refreshes the stale cache by a detached ansible-inventory process, the current run uses the stale instances.
+        """
+        lock_path, log_path = self._get_refresh_paths(cache_key, stale_cache)
+        try:
+            if not self._acquire_refresh_lock(lock_path, log_path):
+                self.display.vvv("The inventory cache is already refreshed in the background")
+                return
+
+            command = [
+                get_bin_path("ansible-inventory", opt_dirs=[os.path.dirname(sys.argv[0])]),
+                "--inventory",
+                os.path.abspath(path),
+                "--list",
+            ]
+            env = dict(os.environ)
+            env[self.REFRESH_ENV] = cache_key
+
+            # A new session, not affected by the end of this run
+            detach = dict(start_new_session=True) if PY3 else dict(preexec_fn=os.setsid)
+            with open(os.devnull, "r+b") as devnull, open(log_path, "wb") as log:
+                process = subprocess.Popen(command, stdin=devnull, stdout=devnull, stderr=log, env=env, close_fds=True, **detach)
+
+            with open(lock_path, "w") as f:
+                f.write(str(process.pid))
+        except (IOError, OSError, ValueError) as e:
+            self._release_refresh_lock(lock_path)
+            self.display.warning("Could not refresh the inventory cache in the background: {0}".format(to_native(e)))
+            return
+
+        self.display.vvv("Refreshing the inventory cache in the background, see {0}".format(log_path))
+
+    def _release_refresh_lock(self, lock_path):
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
     def parse(self, inventory, loader, path, cache=True):
         super(InventoryModule, self).parse(inventory, loader, path)
         self._read_config_data(path)
+        self._compiled_filters = None
+        self._account_hostnames = dict()
         self.load_cache_plugin()
         cache_key = self.get_cache_key(path)
         use_cache = self.get_option("cache") and cache
         update_cache = self.get_option("cache") and not cache
+        stale_cache = self._get_stale_cache()
+
+        # Run by _refresh_in_background(), only the stale copy is written, atomically
+        refreshing = stale_cache is not None and os.environ.get(self.REFRESH_ENV) == cache_key
+        if refreshing:
+            use_cache = update_cache = False
+
+        host_states = previous_host_states = None
+        host_states_cache = self._get_host_states_cache()
+        if host_states_cache is not None:
+            host_states = dict()
+            previous_host_states = self._load_host_states(host_states_cache, cache_key)
 
         instances = None
+        refresh_in_background = False
         if use_cache:
             try:
-                instances = self._cache[cache_key]
+                instances = self._load_cached_instances(self._cache[cache_key])
             except KeyError:
+                pass
+
+            if instances is None and stale_cache is not None:
+                instances = self._load_cached_instances(stale_cache.get(cache_key))
+                # Fresh if refreshed in the background
+                if instances is not None and (stale_cache.get_age(cache_key) or 0) > int(self.get_option("cache_timeout") or 0):
+                    self.display.vvv("Using stale inventory cache, refreshing it in the background")
+                    refresh_in_background = True
+
+            if instances is None:
                 update_cache = True
 
-        if instances is None:
-            instances = self._get_instances()
+        if instances is not None:
+            self._populate(instances, host_states, previous_host_states)
+        else:
+            # Populate page by page, keep the projected instances only for the cache
+            instances = []
+            for page in self._get_instance_pages():
+                self._populate(page, host_states, previous_host_states)
+                if update_cache or refreshing:
+                    instances.extend(page)
 
-        if update_cache:
-            self._cache[cache_key] = instances
+        if host_states_cache is not None:
+            self._save_host_states(host_states_cache, cache_key, host_states)
 
-        self._populate(instances)
+        if refresh_in_background:
+            self._refresh_in_background(path, cache_key, stale_cache)
+        elif refreshing:
+            stale_cache.set(cache_key, self._get_cache_value(instances))
+            self._release_refresh_lock(self._get_refresh_paths(cache_key, stale_cache)[0])
+        elif update_cache:
+            self._update_cache(cache_key, instances, stale_cache)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import bisect
+import math
+import re
+import threading
+
+# Path segments replaced by a placeholder in the path templates:
+# UUIDs, numeric IDs, domain names and IP addresses
+ID_SEGMENT_RE = re.compile(r"^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+|.*[.:].*)$")
+
+
+class VultrApiMetrics:
+    """
+    Metrics of the API requests of a module run.
+
+    The summary dict is updated in place on every recorded event, so it
+    can be referenced by the module result and is current at any exit.
+    The events may be recorded from concurrent threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = []
+        self.summary = {
+            "requests": 0,
+            "requests_by_path": dict(),
+            "bytes_sent": 0,
+            "bytes_received": 0,
+            "not_modified": 0,
+            "memoized": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "backoff_time": 0.0,
+            "rate_limit_time": 0.0,
+            "wait_time": 0.0,
+            "latency_p50": 0.0,
+            "latency_p95": 0.0,
+        }
+
+    @staticmethod
+    def get_path_template(path):
+        path = path.split("?", 1)[0]
+        return "/".join("{id}" if segment and ID_SEGMENT_RE.match(segment) else segment for segment in path.split("/"))
+
+    def _percentile(self, percent):
+        # Nearest rank
+        index = max(0, int(math.ceil(percent / 100.0 * len(self._latencies))) - 1)
+        return round(self._latencies[index], 3)
+
+    def record_request(self, method, path, latency, bytes_sent=0, bytes_received=0):
+        request = "%s %s" % (method, self.get_path_template(path))
+        with self._lock:
+            self.summary["requests"] += 1
+            self.summary["requests_by_path"][request] = self.summary["requests_by_path"].get(request, 0) + 1
+            self.summary["bytes_sent"] += bytes_sent
+            self.summary["bytes_received"] += bytes_received
+
+            bisect.insort(self._latencies, latency)
+            self.summary["latency_p50"] = self._percentile(50)
+            self.summary["latency_p95"] = self._percentile(95)
+
+    def record_not_modified(self):
+        with self._lock:
+            self.summary["not_modified"] += 1
+
+    def record_memoized(self):
+        with self._lock:
+            self.summary["memoized"] += 1
+
+    def record_retry(self, status, delay):
+        with self._lock:
+            self.summary["retries"] += 1
+            if status == 429:
+                self.summary["rate_limited"] += 1
+            self.summary["backoff_time"] = round(self.summary["backoff_time"] + delay, 3)
+
+    def record_rate_limit(self, delay):
+        with self._lock:
+            self.summary["rate_limit_time"] = round(self.summary["rate_limit_time"] + delay, 3)
+
+    def record_wait(self, duration):
+        with self._lock:
+            self.summary["wait_time"] = round(self.summary["wait_time"] + duration, 3)
@@ -26,16 +26,29 @@ class AnsibleVultrCommonInstance(AnsibleVultr):
         },
     }
 
+    def __init__(self, *args, **kwargs):
+        # VPCs listed once per module run, per API version
+        self.vpcs = dict()
+        super(AnsibleVultrCommonInstance, self).__init__(*args, **kwargs)
+
+    def get_vpcs(self, api_version="v1"):
+        if api_version not in self.vpcs:
+            self.vpcs[api_version] = self.query_list(self.VPC_CONFIGS[api_version]["path"], result_key="vpcs")
+        return self.vpcs[api_version]
+
     def get_ssh_key_ids(self):
         ssh_key_names = list(self.module.params["ssh_keys"])
-        ssh_keys = self.query_list(path="/ssh-keys", result_key="ssh_keys")
 
         ssh_key_ids = list()
-        for ssh_key in ssh_keys:
+        for ssh_key in self.query_list_iter(path="/ssh-keys", result_key="ssh_keys"):
             if ssh_key["name"] in ssh_key_names:
                 ssh_key_ids.append(ssh_key["id"])
                 ssh_key_names.remove(ssh_key["name"])
 
+                # Stop paging once all keys are found
+                if not ssh_key_names:
+                    break
+
         if ssh_key_names:
             self.module.fail_json(msg="SSH key names not found: %s" % ", ".join(ssh_key_names))
 
@@ -45,23 +58,24 @@ class AnsibleVultrCommonInstance(AnsibleVultr):
         path = "%s/%s" % (self.resource_path, resource["id"] + self.VPC_CONFIGS[api_version]["path"])
         vpcs = self.query_list(path=path, result_key="vpcs")
 
-        # TODO: Workaround to get the description field into the list if missing
-        result = list()
-        for vpc in vpcs:
-            if "description" in vpc:
-                return vpcs
-
-            vpc_detail = self.query_by_id(resource_id=vpc["id"], path=self.VPC_CONFIGS[api_version]["path"], result_key="vpc")
-            vpc["description"] = vpc_detail["description"]
-            result.append(vpc)
-        return result
+        # Workaround to get the description field into the list if missing,
+        # looked up in the list of all VPCs instead of a request per VPC
+        if any("description" not in vpc for vpc in vpcs):
+            descriptions = dict((vpc["id"], vpc.get("description")) for vpc in self.get_vpcs(api_version=api_version))
+            for vpc in vpcs:
+                if "description" in vpc:
+                    continue
+                if vpc["id"] not in descriptions:
+                    vpc_detail = self.query_by_id(resource_id=vpc["id"], path=self.VPC_CONFIGS[api_version]["path"], result_key="vpc")
+                    descriptions[vpc["id"]] = vpc_detail.get("description")
+                vpc["description"] = descriptions[vpc["id"]]
+        return vpcs
 
     def get_vpc_ids(self, api_version="v1"):
         vpc_names = list(self.module.params[self.VPC_CONFIGS[api_version]["param"]])
-        vpcs = self.query_list(self.VPC_CONFIGS[api_version]["path"], result_key="vpcs")
 
         vpc_ids = list()
-        for vpc in vpcs:
+        for vpc in self.get_vpcs(api_version=api_version):
             if self.module.params["region"] != vpc["region"]:
                 continue
 
@@ -176,37 +190,83 @@ class AnsibleVultrCommonInstance(AnsibleVultr):
                 detach_vpc_ids.append(vpc["id"])
         return detach_vpc_ids
 
-    def configure(self):
-        if self.module.params["state"] != "absent":
-            if self.module.params.get("startup_script") is not None:
-                self.module.params["script_id"] = self.get_startup_script()["id"]
+    def do_update(self, data, resource):
+        # Plan, OS and app changes of instances are processed by jobs, bare metals return none
+        resp = self.api_query(
+            path="%s/%s" % (self.resource_path, resource[self.resource_key_id]),
+            method=self.resource_update_method,
+            data=data,
+        )
 
-            if self.module.params.get("snapshot") is not None:
-                self.module.params["snapshot_id"] = self.get_snapshot()["id"]
+        # Not properly documented, but visible in the Response sample:
+        # https://www.vultr.com/api/#tag/instances/operation/update-instance
 
-            if self.module.params.get("os") is not None:
-                self.module.params["os_id"] = self.get_os()["id"]
+        in_process_jobs = []
+        if resp:
+            job_ids = resp.get("job_ids", [])
+            for job in job_ids:
+                job_resp = self.api_query(path="%s/jobs/%s" % (self.resource_path, job))
+                if job_resp and job_resp.get("state") == "processing":
+                    in_process_jobs.append(job)
 
-            if self.module.params.get("app") is not None:
-                self.module.params["app_id"] = self.get_app()["id"]
+        if len(in_process_jobs) > 0:
+            for job in in_process_jobs:
+                self.wait_for_instance_job(job)
 
-            if self.module.params.get("image") is not None:
-                self.module.params["image_id"] = self.get_image()["image_id"]
+        return self.query_by_id(resource_id=resource[self.resource_key_id])
 
-            if self.module.params.get("user_data") is not None:
-                self.module.params["user_data"] = b64encode(self.module.params["user_data"].encode()).decode('utf-8')
+    def wait_for_instance_job(self, job_id):
+        for dummy in self.poll(timeout=self.module.params["wait_timeout"]):
+            resp = self.api_query(path="%s/jobs/%s" % (self.resource_path, job_id))
+            if resp and resp.get("state") == "success":
+                break
+        else:
+            self.module.fail_json(msg="Wait for instance update completion timed out")
+
+    def get_lookups(self):
+        """
+        Returns a list of (param, lookup) tuples, the independent name to ID
+        lookups setting the module param to the result of the lookup.
+        """
+        lookups = list()
+        if self.module.params.get("startup_script") is not None:
+            lookups.append(("script_id", lambda: self.get_startup_script()["id"]))
+
+        if self.module.params.get("snapshot") is not None:
+            lookups.append(("snapshot_id", lambda: self.get_snapshot()["id"]))
+
+        if self.module.params.get("os") is not None:
+            lookups.append(("os_id", lambda: self.get_os()["id"]))
 
-            if self.module.params.get("ssh_keys") is not None:
-                # sshkey_id ist a list of ids
-                self.module.params["sshkey_id"] = self.get_ssh_key_ids()
+        if self.module.params.get("app") is not None:
+            lookups.append(("app_id", lambda: self.get_app()["id"]))
 
-            if self.module.params.get("vpcs") is not None:
-                # attach_vpc is a list of ids used while creating
-                self.module.params["attach_vpc"] = self.get_vpc_ids()
+        if self.module.params.get("image") is not None:
+            lookups.append(("image_id", lambda: self.get_image()["image_id"]))
 
-            if self.module.params.get("vpc2s") is not None:
-                # attach_vpc2 is a list of ids used while creating
-                self.module.params["attach_vpc2"] = self.get_vpc_ids(api_version="v2")
+        if self.module.params.get("ssh_keys") is not None:
+            # sshkey_id ist a list of ids
+            lookups.append(("sshkey_id", self.get_ssh_key_ids))
+
+        if self.module.params.get("vpcs") is not None:
+            # attach_vpc is a list of ids used while creating
+            lookups.append(("attach_vpc", self.get_vpc_ids))
+
+        if self.module.params.get("vpc2s") is not None:
+            # attach_vpc2 is a list of ids used while creating
+            lookups.append(("attach_vpc2", lambda: self.get_vpc_ids(api_version="v2")))
+
+        return lookups
+
+    def configure(self):
+        if self.module.params["state"] != "absent":
+            lookups = self.get_lookups()
+            results = self.run_concurrently([lookup for param, lookup in lookups])
+            for (param, lookup), result in zip(lookups, results):
+                self.module.params[param] = result
+
+            if self.module.params.get("user_data") is not None:
+                self.module.params["user_data"] = b64encode(self.module.params["user_data"].encode()).decode('utf-8')
 
     def create(self):
         param_keys = ("os", "image", "app", "snapshot")
@@ -243,7 +303,12 @@ class AnsibleVultrCommonInstance(AnsibleVultr):
     def create_or_update(self):
         resource = super(AnsibleVultrCommonInstance, self).create_or_update()
         if resource:
-            resource = self.wait_for_state(resource=resource, key="status", states=["active"], retries=300)
+            resource = self.wait_for_state(
+                resource=resource,
+                key="status",
+                states=["active"],
+                poll_hint=self.WAIT_POLL_HINTS.get(self.resource_path),
+            )
         return resource
 
     def transform_result(self, resource):
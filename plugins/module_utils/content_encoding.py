@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import zlib
+
+# Sent as Accept-Encoding by the requests decoding their responses with read_body()
+ACCEPT_ENCODING = "gzip, deflate"
+
+CHUNK_SIZE = 64 * 1024
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class VultrBodyDecoder:
+    """
+    Incremental decoder of a gzip or deflate content encoded response body.
+
+    A gzip body not starting with the gzip magic bytes is passed through as
+    it is, it was already decoded, e.g. by ansible.module_utils.urls.Request.
+    Deflate bodies are expected to be zlib wrapped as of RFC 9110, raw
+    deflate streams sent by some servers are accepted as well.
+    """
+
+    def __init__(self, encoding):
+        self.encoding = (encoding or "").strip().lower()
+        self._decompressor = None
+        self._identity = self.encoding not in ("gzip", "x-gzip", "deflate")
+        self._head = b""
+
+    def _get_decompressor(self, head):
+        if self.encoding == "deflate":
+            decompressor = zlib.decompressobj()
+            try:
+                decompressor.decompress(head)
+            except zlib.error:
+                return zlib.decompressobj(-zlib.MAX_WBITS)
+            return zlib.decompressobj()
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, chunk):
+        if self._identity:
+            return chunk
+
+        if self._decompressor is None:
+            # The format is detected from the first bytes, which may arrive split
+            self._head += chunk
+            if len(self._head) < 2:
+                return b""
+            chunk, self._head = self._head, b""
+            if self.encoding != "deflate" and not chunk.startswith(GZIP_MAGIC):
+                self._identity = True
+                return chunk
+            self._decompressor = self._get_decompressor(chunk[:2])
+
+        return self._decompressor.decompress(chunk)
+
+    def flush(self):
+        if self._decompressor is None:
+            head, self._head = self._head, b""
+            return head
+        return self._decompressor.flush()
+
+
+def read_body(fp, encoding, chunk_size=CHUNK_SIZE):
+    """
+    Reads and decodes a response body chunk by chunk,
+    raises zlib.error on a corrupt body.
+    Returns a tuple (body, size) of the decoded body and the bytes read.
+    """
+    decoder = VultrBodyDecoder(encoding)
+    chunks = []
+    size = 0
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        chunks.append(decoder.decompress(chunk))
+    chunks.append(decoder.flush())
+    return b"".join(chunks), size
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+
+from ansible.module_utils._text import to_bytes
+
+from .records import pack_value, unpack_value
+
+
+class VultrLookupCache:
+    """
+    TTL based on-disk cache for rarely changing API collections.
+
+    Every entry lives in its own file, written to a temp file and renamed
+    into place, so many forks can read and write the cache concurrently
+    without locking: readers either see the old or the new entry.
+
+    Lists of records are stored compressed in the format of pack_records().
+    """
+
+    FILE_SUFFIX = ".json"
+
+    # Size bounds, the oldest entries are evicted first
+    MAX_ENTRIES = 128
+    MAX_BYTES = 32 * 1024 * 1024
+
+    def __init__(self, cache_dir, ttl):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.ttl = ttl
+
+    def get_key(self, api_endpoint, path, query_params=None):
+        key = json.dumps([api_endpoint, path, sorted((query_params or dict()).items())])
+        return hashlib.sha256(to_bytes(key)).hexdigest()
+
+    def _get_file_path(self, key):
+        return os.path.join(self.cache_dir, key + self.FILE_SUFFIX)
+
+    def get(self, key):
+        file_path = self._get_file_path(key)
+        try:
+            if os.stat(file_path).st_mtime + self.ttl < time.time():
+                return None
+            with open(file_path) as f:
+                return unpack_value(json.load(f))
+        except (IOError, OSError, ValueError, KeyError, TypeError, zlib.error):
+            return None
+
+    def get_age(self, key):
+        """
+        Returns the seconds since the entry was written, None if there is none.
+        """
+        try:
+            return time.time() - os.stat(self._get_file_path(key)).st_mtime
+        except OSError:
+            return None
+
+    def set(self, key, value):
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir, 0o700)
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(pack_value(value, compress=True), f)
+                os.rename(tmp_path, self._get_file_path(key))
+            except Exception:
+                os.remove(tmp_path)
+                raise
+        except (IOError, OSError, TypeError, ValueError):
+            # A cache we can not write or a value we can not serialize is not an error
+            return
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+        now = time.time()
+        try:
+            file_names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+
+        for file_name in file_names:
+            if not file_name.endswith(self.FILE_SUFFIX):
+                continue
+            file_path = os.path.join(self.cache_dir, file_name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+
+            if stat.st_mtime + self.ttl < now:
+                self._remove(file_path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, file_path))
+
+        # Newest first, drop everything exceeding the bounds
+        entries.sort(reverse=True)
+        total_bytes = 0
+        for count, (mtime, size, file_path) in enumerate(entries, start=1):
+            total_bytes += size
+            if count > self.MAX_ENTRIES or total_bytes > self.MAX_BYTES:
+                self._remove(file_path)
+
+    @staticmethod
+    def _remove(file_path):
+        try:
+            os.remove(file_path)
+        except OSError:
+            # Removed by a concurrent process
+            pass
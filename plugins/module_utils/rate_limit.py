@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from ansible.module_utils._text import to_bytes
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+
+class VultrRateLimiter:
+    """
+    Client side token bucket rate limiter.
+
+    The bucket state, the time the next token is available, is kept in a
+    small file locked with flock(), so all processes using the same API key
+    on a host share one bucket. Without fcntl the bucket is per process.
+    """
+
+    # Tokens which may be consumed at once, 1 spreads the requests evenly
+    BURST = 1
+
+    STATE_FORMAT = "!d"
+
+    _local_lock = threading.Lock()
+
+    def __init__(self, rate, api_endpoint, api_key, state_dir=None):
+        self.interval = 1.0 / rate
+        self.tolerance = self.interval * (self.BURST - 1)
+        self._next_token = 0.0
+
+        bucket = hashlib.sha256(to_bytes("%s %s" % (api_endpoint, api_key))).hexdigest()[:16]
+        self.state_file = os.path.join(
+            state_dir or tempfile.gettempdir(),
+            "ansible-vultr-%s-%s.ratelimit" % (os.getuid() if hasattr(os, "getuid") else 0, bucket),
+        )
+
+    def _reserve(self, next_token):
+        # Returns the new state and the delay until the token is available
+        now = time.time()
+        next_token = max(next_token, now)
+        delay = max(0.0, next_token - self.tolerance - now)
+        return next_token + self.interval, delay
+
+    def _reserve_shared(self):
+        fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            data = os.read(fd, struct.calcsize(self.STATE_FORMAT))
+            next_token = struct.unpack(self.STATE_FORMAT, data)[0] if len(data) == struct.calcsize(self.STATE_FORMAT) else 0.0
+
+            next_token, delay = self._reserve(next_token)
+
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, struct.pack(self.STATE_FORMAT, next_token))
+            return delay
+        finally:
+            # Closing releases the lock
+            os.close(fd)
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent, returns the seconds waited.
+        """
+        delay = None
+        if HAS_FCNTL:
+            try:
+                delay = self._reserve_shared()
+            except (IOError, OSError):
+                # Fall back to a per process bucket
+                pass
+
+        if delay is None:
+            with self._local_lock:
+                self._next_token, delay = self._reserve(self._next_token)
+
+        if delay > 0:
+            time.sleep(delay)
+        return delay
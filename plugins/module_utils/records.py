@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import base64
+import json
+import zlib
+
+from ansible.module_utils._text import to_bytes, to_text
+
+# Marks a packed list of records
+RECORDS_FORMAT = "vultr-records-v1"
+
+
+class VultrRecords:
+    """
+    Read only sequence of records packed by pack_records().
+
+    The rows are decompressed on first access and turned into dicts one at a
+    time while iterating, so a large cache is not materialized at once.
+    """
+
+    def __init__(self, packed):
+        self.fields = packed["fields"]
+        self._rows = packed.get("rows")
+        self._compressed_rows = packed.get("compressed_rows")
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            self._rows = json.loads(to_text(zlib.decompress(base64.b64decode(self._compressed_rows))))
+            self._compressed_rows = None
+        return self._rows
+
+    def _to_record(self, row):
+        # Records not having all fields are kept as they are
+        if isinstance(row, dict):
+            return row
+        return dict(zip(self.fields, row))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        for row in self.rows:
+            yield self._to_record(row)
+
+    def __getitem__(self, index):
+        return self._to_record(self.rows[index])
+
+
+def is_record_list(value):
+    return isinstance(value, list) and len(value) > 0 and all(isinstance(record, dict) for record in value)
+
+
+def is_packed_records(value):
+    return isinstance(value, dict) and value.get("format") == RECORDS_FORMAT
+
+
+def pack_records(records, compress=False):
+    """
+    Packs a list of dicts into field names, stored once, and rows of values.
+    """
+    fields = []
+    for record in records:
+        for field in record:
+            if field not in fields:
+                fields.append(field)
+
+    rows = []
+    for record in records:
+        if len(record) == len(fields):
+            rows.append([record[field] for field in fields])
+        else:
+            rows.append(record)
+
+    packed = {
+        "format": RECORDS_FORMAT,
+        "fields": fields,
+    }
+    if compress:
+        packed["compressed_rows"] = to_text(base64.b64encode(zlib.compress(to_bytes(json.dumps(rows, separators=(",", ":"))))))
+    else:
+        packed["rows"] = rows
+    return packed
+
+
+def unpack_records(packed):
+    return VultrRecords(packed)
+
+
+def pack_value(value, compress=False):
+    """
+    Packs the lists of records of a dict, e.g. a paginated API result.
+    """
+    if not isinstance(value, dict):
+        return value
+    return dict((k, pack_records(v, compress=compress) if is_record_list(v) else v) for k, v in value.items())
+
+
+def unpack_value(value):
+    """
+    Reverts pack_value(), the lists of records are materialized.
+    """
+    if not isinstance(value, dict):
+        return value
+    return dict((k, list(unpack_records(v)) if is_packed_records(v) else v) for k, v in value.items())
@@ -6,17 +6,50 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import math
 import random
+import socket
+import threading
 import time
+import zlib
+from collections import OrderedDict
+from email.utils import mktime_tz, parsedate_tz
 
-from ansible.module_utils._text import to_text
+from ansible.module_utils._text import to_bytes, to_native, to_text
 from ansible.module_utils.basic import env_fallback
 from ansible.module_utils.common.dict_transformations import dict_merge
-from ansible.module_utils.six.moves.urllib.parse import quote
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves.urllib.parse import quote, urlparse
+from ansible.module_utils.six.moves.urllib.request import getproxies, proxy_bypass
 from ansible.module_utils.urls import fetch_url
 
+from .api_metrics import VultrApiMetrics
+from .content_encoding import ACCEPT_ENCODING, read_body
+from .lookup_cache import VultrLookupCache
+from .rate_limit import VultrRateLimiter
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+
+    HAS_THREAD_POOL = True
+except ImportError:
+    HAS_THREAD_POOL = False
+
+try:
+    import ssl
+
+    HAS_SSL = True
+except ImportError:
+    HAS_SSL = False
+
 VULTR_USER_AGENT = "Ansible Vultr v2"
 
+# Requests which may be sent again without side effects
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+# The server closed the connection without sending a status line
+REMOTE_DISCONNECTED = getattr(http_client, "RemoteDisconnected", http_client.BadStatusLine)
+
 
 def vultr_argument_spec():
     return dict(
@@ -47,10 +80,30 @@ def vultr_argument_spec():
             default=12,
         ),
         api_results_per_page=dict(
-            type="int",
+            type="raw",
             fallback=(env_fallback, ["VULTR_API_RESULTS_PER_PAGE"]),
             default=100,
         ),
+        api_conditional_requests=dict(
+            type="bool",
+            fallback=(env_fallback, ["VULTR_API_CONDITIONAL_REQUESTS"]),
+            default=False,
+        ),
+        api_rate_limit=dict(
+            type="float",
+            fallback=(env_fallback, ["VULTR_API_RATE_LIMIT"]),
+            default=0,
+        ),
+        api_cache_ttl=dict(
+            type="int",
+            fallback=(env_fallback, ["VULTR_API_CACHE_TTL"]),
+            default=0,
+        ),
+        api_cache_dir=dict(
+            type="path",
+            fallback=(env_fallback, ["VULTR_API_CACHE_DIR"]),
+            default="~/.ansible/cache/vultr",
+        ),
         validate_certs=dict(
             type="bool",
             default=True,
@@ -58,15 +111,402 @@ def vultr_argument_spec():
     )
 
 
-def backoff(retry, retry_max_delay=12):
-    randomness = random.randint(0, 1000) / 1000.0
-    delay = 2**retry + randomness
-    if delay > retry_max_delay:
-        delay = retry_max_delay + randomness
-    time.sleep(delay)
+def poll(timeout, hint=None, min_interval=1.0, max_interval=10.0):
+    """
+    Generator yielding until the deadline is reached, sleeping between the yields.
+
+    The first poll is immediate, then the interval grows from min_interval up to max_interval.
+    With a hint, the typical seconds until the polled state is reached, the interval
+    grows faster and beyond max_interval before the expected time, without passing it,
+    so a state reached early is still seen early.
+    """
+    start = time.time()
+    deadline = start + timeout
+    interval = min_interval
+
+    yield
+    while True:
+        now = time.time()
+        if now >= deadline:
+            return
+
+        elapsed = now - start
+        if hint and elapsed < hint * 0.75:
+            delay = min(interval, max(min_interval, hint * 0.75 - elapsed))
+            interval = min(max(max_interval, hint * 0.25), interval * 2)
+        else:
+            interval = min(max_interval, interval)
+            delay = interval
+            interval = min(max_interval, interval * 1.5)
+
+        time.sleep(min(delay, deadline - now))
+        yield
+
+
+def parse_retry_after(info):
+    """
+    Returns the delay in seconds the API asks to wait before retrying,
+    or None if the response does not tell.
+    """
+    retry_after = info.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            # HTTP date
+            parsed = parsedate_tz(retry_after)
+            if parsed:
+                return max(0.0, mktime_tz(parsed) - time.time())
+
+    # Rate limit headers, reset is either a delta or an epoch timestamp
+    for prefix in ("x-ratelimit-", "ratelimit-"):
+        remaining = info.get(prefix + "remaining")
+        reset = info.get(prefix + "reset")
+        if reset is None or (remaining is not None and remaining.strip() not in ("0", "0.0")):
+            continue
+        try:
+            reset = float(reset)
+        except ValueError:
+            continue
+        if reset > 1000000000:
+            reset -= time.time()
+        return max(0.0, reset)
+
+    return None
+
+
+def retry_delay(info, previous_delay=0, retry_max_delay=12, max_delay=180):
+    """
+    Returns the delay in seconds before retrying a failed request.
+    The delay asked for by the API is honored up to max_delay,
+    otherwise it is a decorrelated jitter up to retry_max_delay.
+    """
+    delay = parse_retry_after(info)
+    if delay is not None:
+        # A little bit of randomness to not retry all at once
+        return min(delay, max_delay) + random.randint(0, 250) / 1000.0
+
+    return min(retry_max_delay, random.uniform(1, max(1, previous_delay) * 3))
+
+
+class VultrDeferredFailure(Exception):
+    """
+    Raised instead of fail_json() in worker threads, carries the fail_json() kwargs.
+    """
+
+    def __init__(self, fail_kwargs):
+        super(VultrDeferredFailure, self).__init__(fail_kwargs.get("msg"))
+        self.fail_kwargs = fail_kwargs
+
+
+class VultrConnectionError(Exception):
+    """
+    Raised by the connection pool, sent tells if the request may have reached the server.
+    """
+
+    def __init__(self, error, sent, stale=False):
+        super(VultrConnectionError, self).__init__(to_native(error))
+        self.sent = sent
+        self.stale = stale
+
+
+class VultrConnectionPool:
+    """
+    Keeps idle keep-alive HTTP(S) connections per API endpoint for reuse
+    during the lifetime of the module process.
+
+    Unlike fetch_url, the pool does not use proxies, client certificates,
+    a custom CA path or redirects. Requests needing a proxy, as of the proxy
+    and no_proxy environment variables, are sent by fetch_url, the others
+    are not configurable by the modules. validate_certs is honored, using
+    the default CA certificates of the system.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = dict()
+
+    @staticmethod
+    def is_usable(url):
+        # fetch_url knows how to deal with proxies, we do not
+        parsed = urlparse(url)
+        if parsed.scheme == "https" and not HAS_SSL:
+            return False
+        proxies = getproxies()
+        if (proxies.get(parsed.scheme) or proxies.get("all")) and not proxy_bypass(parsed.hostname):
+            return False
+        return parsed.scheme in ("http", "https")
+
+    def _connect(self, scheme, netloc, timeout, validate_certs):
+        if scheme == "https":
+            if validate_certs:
+                context = ssl.create_default_context()
+            else:
+                context = ssl._create_unverified_context()
+            return http_client.HTTPSConnection(netloc, timeout=timeout, context=context)
+        return http_client.HTTPConnection(netloc, timeout=timeout)
+
+    def acquire(self, key, timeout, validate_certs):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                # The timeout of the connection only applies to new sockets
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self._connect(key[0], key[1], timeout, validate_certs), False
+
+    def release(self, key, conn):
+        with self._lock:
+            self._idle.setdefault(key, []).append(conn)
+
+    def _request(self, conn, reused, method, target, data, headers):
+        sent = False
+        responding = False
+        try:
+            if conn.sock is None:
+                conn.connect()
+            sent = True
+            conn.request(method, target, body=data, headers=headers)
+            responding = True
+            resp = conn.getresponse()
+            body, size = read_body(resp, resp.getheader("content-encoding"))
+        except (socket.error, http_client.HTTPException, zlib.error) as e:
+            conn.close()
+            # The server closed the idle connection before reading the request or sending any response bytes
+            stale = reused and (
+                isinstance(e, REMOTE_DISCONNECTED) or (not responding and isinstance(e, socket.error) and not isinstance(e, socket.timeout))
+            )
+            raise VultrConnectionError(e, sent=sent, stale=stale)
+        return resp, body, size
+
+    def request(self, url, method, data, headers, timeout, validate_certs):
+        """
+        Returns a tuple (status, reason, headers, body, size) or raises VultrConnectionError.
+        The response body is decoded if it was compressed, size is the amount of bytes received.
+
+        A request failing on a reused connection is sent again on a fresh one
+        only if the server did not process it or if the method is idempotent.
+        """
+        if data is not None:
+            data = to_bytes(data, errors="surrogate_or_strict")
+
+        headers = dict(headers or dict())
+        headers.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+
+        parsed = urlparse(url)
+        key = (parsed.scheme, parsed.netloc, validate_certs)
+        target = parsed.path or "/"
+        if parsed.query:
+            target += "?" + parsed.query
+
+        conn, reused = self.acquire(key, timeout, validate_certs)
+        try:
+            resp, body, size = self._request(conn, reused, method, target, data, headers)
+        except VultrConnectionError as e:
+            if not reused or not (e.stale or method in IDEMPOTENT_METHODS):
+                raise
+            conn = self._connect(parsed.scheme, parsed.netloc, timeout, validate_certs)
+            resp, body, size = self._request(conn, False, method, target, data, headers)
+
+        resp_headers = dict()
+        for name, value in resp.getheaders():
+            name = name.lower()
+            if name in resp_headers:
+                resp_headers[name] = ", ".join((resp_headers[name], value))
+            else:
+                resp_headers[name] = value
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self.release(key, conn)
+
+        return resp.status, resp.reason, resp_headers, body, size
+
+
+# Connections are shared by all AnsibleVultr objects of the module process
+CONNECTION_POOL = VultrConnectionPool()
+
+
+class VultrValidatorCache:
+    """
+    Validators (ETag, Last-Modified) and bodies of GET responses by URL,
+    used to revalidate repeated reads by conditional requests.
+    """
+
+    # The least recently used entries are dropped first
+    MAX_ENTRIES = 256
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get_headers(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None:
+            return dict()
+
+        headers = dict()
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_body(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            # Mark as recently used
+            del self._entries[url]
+            self._entries[url] = entry
+            return entry["body"]
+
+    def store(self, url, info, body):
+        etag = info.get("etag")
+        last_modified = info.get("last-modified")
+        with self._lock:
+            self._entries.pop(url, None)
+            if not etag and not last_modified:
+                return
+
+            self._entries[url] = dict(etag=etag, last_modified=last_modified, body=body)
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+
+# Validators are shared by all AnsibleVultr objects of the module process
+VALIDATOR_CACHE = VultrValidatorCache()
+
+
+class VultrPageSizer:
+    """
+    Page sizes of the api_results_per_page auto mode.
+
+    Bulk listings start at the API maximum, lookups filtered by the API
+    start with small pages. The response bytes per resource are learned
+    per endpoint while the module runs, so a page stays within the memory
+    budget, and a filtered lookup matching more than a page continues in
+    large pages.
+    """
+
+    # Vultr API maximum
+    MAX_PAGE_SIZE = 500
+    FILTERED_PAGE_SIZE = 25
+    # Response bytes of a page
+    MEMORY_BUDGET = 4 * 1024 * 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resource_sizes = dict()
+
+    def get_page_size(self, path, filtered=False):
+        page_size = self.FILTERED_PAGE_SIZE if filtered else self.MAX_PAGE_SIZE
+        with self._lock:
+            resource_size = self._resource_sizes.get(VultrApiMetrics.get_path_template(path))
+        if resource_size:
+            page_size = min(page_size, max(1, self.MEMORY_BUDGET // resource_size))
+        return page_size
+
+    def record(self, path, resources, size):
+        if not resources:
+            return
+
+        # The size of the decoded body, not the compressed size as transferred:
+        # the budget bounds the memory used by a page
+        path = VultrApiMetrics.get_path_template(path)
+        resource_size = int(math.ceil(size / float(resources)))
+        with self._lock:
+            # The largest resources seen are kept, pages must not exceed the budget
+            self._resource_sizes[path] = max(resource_size, self._resource_sizes.get(path, 0))
+
+
+# Learned page sizes are shared by all AnsibleVultr objects of the module process
+PAGE_SIZER = VultrPageSizer()
+
+
+class VultrResponseMemo:
+    """
+    Bodies of GET responses of single resources by URL, so the module run
+    reads a resource once. Lists are not kept, a paginated listing holds
+    one page in memory only.
+
+    A request changing a resource drops the entries of its path, of the
+    resources below it and of its parent resources.
+    """
+
+    # The least recently stored entries are dropped first
+    MAX_ENTRIES = 256
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+        return entry["body"] if entry is not None else None
+
+    def store(self, url, body):
+        with self._lock:
+            self._entries.pop(url, None)
+            self._entries[url] = dict(path=url.rstrip("/"), body=body)
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url):
+        path = url.split("?", 1)[0].rstrip("/")
+        with self._lock:
+            # Entries are single resources without a query
+            for key, entry in list(self._entries.items()):
+                if entry["path"] == path or entry["path"].startswith(path + "/") or path.startswith(entry["path"] + "/"):
+                    del self._entries[key]
+
+
+# Responses are shared by all AnsibleVultr objects of the module process
+RESPONSE_MEMO = VultrResponseMemo()
 
 
 class AnsibleVultr:
+    # List endpoints filtering on the server side: resource key -> query param.
+    # The list endpoints of the other resources looked up by name, e.g. bare metals,
+    # load balancers, block storages, reserved IPs, VPCs, SSH keys and firewall groups,
+    # only take the paging params per_page and cursor as of the v2 API.
+    SERVER_SIDE_FILTERS = {
+        "/instances": {
+            "hostname": "hostname",
+            "label": "label",
+            "main_ip": "main_ip",
+            "region": "region",
+        },
+        "/snapshots": {
+            "description": "description",
+        },
+    }
+
+    # Typical seconds until a new resource is ready, to poll less before
+    WAIT_POLL_HINTS = {
+        "/bare-metals": 300,
+        "/instances": 30,
+        "/load-balancers": 60,
+        "/object-storage": 30,
+        "/snapshots": 60,
+    }
+
+    # Rarely changing collections, the same for all users of an API endpoint
+    CACHEABLE_PATHS = (
+        "/applications",
+        "/os",
+        "/plans",
+        "/plans-metal",
+        "/regions",
+    )
+
     def __init__(
         self,
         module,
@@ -113,6 +553,23 @@ class AnsibleVultr:
         # Some resources have PUT, many have PATCH
         self.resource_update_method = resource_update_method
 
+        # An integer or auto, ints of the raw type may be strings, e.g. from the env fallback
+        if module.params["api_results_per_page"] != "auto":
+            try:
+                results_per_page = int(module.params["api_results_per_page"])
+            except (TypeError, ValueError):
+                results_per_page = 0
+            if results_per_page < 1:
+                module.fail_json(msg="api_results_per_page must be a positive integer or auto, got: %s" % module.params["api_results_per_page"])
+            module.params["api_results_per_page"] = results_per_page
+
+        # Nesting level of poll(), memoized responses are not used while polling
+        self._polling = 0
+
+        # May be set before by subclasses sharing the metrics of another object
+        if getattr(self, "metrics", None) is None:
+            self.metrics = VultrApiMetrics()
+
         self.result = {
             "changed": False,
             namespace: dict(),
@@ -123,6 +580,8 @@ class AnsibleVultr:
                 "api_retry_max_delay": module.params["api_retry_max_delay"],
                 "api_results_per_page": module.params["api_results_per_page"],
                 "api_endpoint": module.params["api_endpoint"],
+                # Updated in place while the module runs
+                "metrics": self.metrics.summary,
             },
         }
 
@@ -133,53 +592,238 @@ class AnsibleVultr:
             "Accept": "application/json",
         }
 
+        # Opt-in client side rate limit, shared by all processes on the host
+        self.rate_limiter = None
+        if (module.params.get("api_rate_limit") or 0) < 0:
+            module.fail_json(msg="api_rate_limit must be 0 or greater, got: %s" % module.params["api_rate_limit"])
+        if module.params.get("api_rate_limit"):
+            self.rate_limiter = VultrRateLimiter(
+                rate=module.params["api_rate_limit"],
+                api_endpoint=module.params["api_endpoint"],
+                api_key=module.params["api_key"],
+            )
+
+        # Opt-in on-disk cache for the CACHEABLE_PATHS
+        self.lookup_cache = None
+        if module.params.get("api_cache_ttl"):
+            self.lookup_cache = VultrLookupCache(
+                cache_dir=module.params["api_cache_dir"],
+                ttl=module.params["api_cache_ttl"],
+            )
+
         # Hook custom configurations
         self.configure()
 
     def configure(self):
         pass
 
+    def run_concurrently(self, tasks, max_workers=4):
+        """
+        Runs the callables in a bounded thread pool and returns their results in order.
+        Failures are reported as if the tasks ran one after another:
+        The first failed task in order fails the module.
+        """
+        if not HAS_THREAD_POOL or len(tasks) < 2:
+            return [task() for task in tasks]
+
+        fail_json = self.module.fail_json
+        main_thread = threading.current_thread()
+
+        def deferred_fail_json(**kwargs):
+            if threading.current_thread() is main_thread:
+                fail_json(**kwargs)
+            raise VultrDeferredFailure(kwargs)
+
+        self.module.fail_json = deferred_fail_json
+        try:
+            executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)))
+            try:
+                futures = [executor.submit(task) for task in tasks]
+                results = []
+                failure = None
+                for future in futures:
+                    try:
+                        results.append(future.result())
+                    except VultrDeferredFailure as e:
+                        failure = failure or e
+                        results.append(None)
+            finally:
+                executor.shutdown(wait=True)
+        finally:
+            self.module.fail_json = fail_json
+
+        if failure is not None:
+            self.module.fail_json(**failure.fail_kwargs)
+
+        return results
+
     def transform_resource(self, resource):
         """
         Transforms (optional) the resource dict queried from the API
         """
         return resource
 
-    def paginate_api_query(
-        self, path, method="GET", data=None, query_params=None, result_key=None
-    ):
-        result_key = result_key or self.resource_result_key_plural
-        pager_param = dict(per_page=self.module.params["api_results_per_page"])
+    def is_lookup(self, path, query_params):
+        # Filtered by the API for a few matches, e.g. by label, in contrast to a listing by region
+        server_side_filters = self.SERVER_SIDE_FILTERS.get(path, dict())
+        return any(param in (query_params or dict()) for key, param in server_side_filters.items() if key != "region")
+
+    def get_pager_query_params(self, query_params=None, path=None):
+        per_page = self.module.params["api_results_per_page"]
+        if per_page == "auto":
+            per_page = PAGE_SIZER.get_page_size(path or "", filtered=self.is_lookup(path, query_params))
+        pager_param = dict(per_page=per_page)
         if query_params is not None:
-            query_params = dict_merge(query_params, pager_param)
-        else:
-            query_params = pager_param
+            return dict_merge(query_params, pager_param)
+        return pager_param
+
+    def get_lookup_cache_key(self, path, method, query_params):
+        if self.lookup_cache is None or method != "GET" or path not in self.CACHEABLE_PATHS:
+            return None
+
+        # The page size does not change the result
+        return self.lookup_cache.get_key(
+            api_endpoint=self.module.params["api_endpoint"],
+            path=path,
+            query_params=dict((k, v) for k, v in query_params.items() if k != "per_page"),
+        )
+
+    def paginate_api_query_pages(self, path, method="GET", data=None, query_params=None, result_key=None):
+        """
+        Generator yielding the list of resources of each page.
+        """
+        result_key = result_key or self.resource_result_key_plural
+        auto_page_size = self.module.params["api_results_per_page"] == "auto"
+        lookup_params = query_params if self.is_lookup(path, query_params) else None
+        query_params = self.get_pager_query_params(query_params, path=path)
 
-        result = dict()
         cursor = dict()
         while True:
-            resp = self.api_query(
+            resp, resp_size = self._api_query(
                 path=path,
                 method=method,
                 data=data,
                 query_params=dict_merge(query_params, cursor),
             )
 
-            if isinstance(resp, dict):
-                resp_body = resp.get(result_key, {})
-                if isinstance(resp_body, list):
-                    if isinstance(result.get(result_key), list):
-                        result[result_key].extend(resp_body)
-                    else:
-                        result[result_key] = resp_body
-                cursor["cursor"] = resp.get("meta", {}).get("links", {}).get("next", "")
+            if not isinstance(resp, dict):
+                return
 
-                if cursor["cursor"] == "":
-                    return result
-            else:
+            resp_body = resp.get(result_key, {})
+            if auto_page_size and isinstance(resp_body, list):
+                PAGE_SIZER.record(path, len(resp_body), resp_size)
+
+            if isinstance(resp_body, list):
+                yield resp_body
+
+            cursor["cursor"] = resp.get("meta", {}).get("links", {}).get("next", "")
+            if cursor["cursor"] == "":
+                return
+
+            if auto_page_size and lookup_params:
+                # More matches than expected, continue in large pages
+                query_params = dict_merge(lookup_params, dict(per_page=PAGE_SIZER.get_page_size(path)))
+
+    def paginate_api_query_iter(self, path, method="GET", data=None, query_params=None, result_key=None):
+        """
+        Generator yielding the resources page by page, holding one page in memory.
+        Cached collections are served from the lookup cache.
+        """
+        cache_key = self.get_lookup_cache_key(path, method, self.get_pager_query_params(query_params))
+        if cache_key is not None:
+            result_key = result_key or self.resource_result_key_plural
+            result = self.paginate_api_query(path=path, method=method, data=data, query_params=query_params, result_key=result_key)
+            for resource in result.get(result_key, []):
+                yield resource
+            return
+
+        for page in self.paginate_api_query_pages(path=path, method=method, data=data, query_params=query_params, result_key=result_key):
+            for resource in page:
+                yield resource
+
+    def paginate_api_query(
+        self, path, method="GET", data=None, query_params=None, result_key=None
+    ):
+        result_key = result_key or self.resource_result_key_plural
+
+        cache_key = self.get_lookup_cache_key(path, method, self.get_pager_query_params(query_params))
+        if cache_key is not None:
+            result = self.lookup_cache.get(cache_key)
+            if result is not None:
                 return result
 
+        result = dict()
+        for page in self.paginate_api_query_pages(path=path, method=method, data=data, query_params=query_params, result_key=result_key):
+            result.setdefault(result_key, []).extend(page)
+
+        if cache_key is not None and result:
+            self.lookup_cache.set(cache_key, result)
+        return result
+
+    def fetch(self, url, method="GET", data=None, headers=None):
+        """
+        Sends the request over a pooled keep-alive connection,
+        falls back to fetch_url if the pool can not be used.
+        Returns a tuple (body, info) compatible to fetch_url.
+        """
+        timeout = int(self.module.params["api_timeout"])
+        headers = dict(self.headers, **(headers or dict()))
+        start = time.time()
+        body, info = self._fetch(url=url, method=method, data=data, headers=headers, timeout=timeout)
+        self.metrics.record_request(
+            method=method,
+            path=url[len(self.module.params["api_endpoint"]):],
+            latency=time.time() - start,
+            bytes_sent=len(data or ""),
+            bytes_received=info.pop("bytes_received", len(body or info.get("body") or "")),
+        )
+        return body, info
+
+    def _fetch(self, url, method, data, headers, timeout):
+        if CONNECTION_POOL.is_usable(url):
+            try:
+                status, reason, headers, body, size = CONNECTION_POOL.request(
+                    url=url,
+                    method=method,
+                    data=data,
+                    headers=headers,
+                    timeout=timeout,
+                    validate_certs=self.module.params["validate_certs"],
+                )
+            except VultrConnectionError as e:
+                if e.sent and method not in IDEMPOTENT_METHODS:
+                    # Not sent again, the server may have processed it
+                    return "", dict(url=url, status=-1, msg="Connection failure: %s" % to_native(e))
+                self.module.debug("Pooled connection failed, falling back to fetch_url: %s" % to_native(e))
+            else:
+                info = dict(url=url, status=status)
+                info.update(headers)
+                # Compressed size, as transferred
+                info["bytes_received"] = size
+                if status >= 400:
+                    info.update(msg="HTTP Error %s: %s" % (status, reason), body=body)
+                    body = ""
+                else:
+                    info.update(msg="OK (%s bytes)" % headers.get("content-length", "unknown"))
+                return body, info
+
+        resp, info = fetch_url(
+            module=self.module,
+            url=url,
+            method=method,
+            data=data,
+            headers=headers,
+            timeout=timeout,
+        )
+        return (resp.read() if resp is not None else ""), info
+
     def api_query(self, path, method="GET", data=None, query_params=None):
+        return self._api_query(path=path, method=method, data=data, query_params=query_params)[0]
+
+    def _api_query(self, path, method="GET", data=None, query_params=None):
+        """
+        Returns a tuple (result, size) of the decoded result and the size of the decoded response body.
+        """
         if query_params:
             query = "?"
             for k, v in query_params.items():
@@ -191,21 +835,33 @@ class AnsibleVultr:
 
         retry_max_delay = self.module.params["api_retry_max_delay"]
 
+        url = self.module.params["api_endpoint"] + path
+        conditional = method == "GET" and self.module.params.get("api_conditional_requests")
+
+        # Only single resources are memoized, lists are queried with pager params.
+        # Polled resources are expected to change, they are read again.
+        memoize = method == "GET" and not query_params
+        if memoize and not self._polling:
+            resp_body = RESPONSE_MEMO.get(url)
+            if resp_body is not None:
+                self.metrics.record_memoized()
+                return self.module.from_json(to_text(resp_body, errors="surrogate_or_strict")), len(resp_body)
+
         info = dict()
         resp_body = None
         retry = 0
+        delay = 0
         for retry in range(0, self.module.params["api_retries"]):
-            resp, info = fetch_url(
-                module=self.module,
-                url=self.module.params["api_endpoint"] + path,
+            if self.rate_limiter is not None:
+                self.metrics.record_rate_limit(self.rate_limiter.acquire())
+
+            resp_body, info = self.fetch(
+                url=url,
                 method=method,
                 data=data,
-                headers=self.headers,
-                timeout=int(self.module.params["api_timeout"]),
+                headers=VALIDATOR_CACHE.get_headers(url) if conditional else None,
             )
 
-            resp_body = resp.read() if resp is not None else ""
-
             # Check for:
             # 429 Too Many Requests
             # 500 Internal Server Error
@@ -214,21 +870,45 @@ class AnsibleVultr:
                 break
 
             # Vultr has a rate limiting requests per second, try to be polite
-            # Use exponential backoff plus a little bit of randomness
-            backoff(retry=retry, retry_max_delay=retry_max_delay)
+            # Wait as long as told by the API or use a jittered backoff
+            delay = retry_delay(
+                info=info,
+                previous_delay=delay,
+                retry_max_delay=retry_max_delay,
+                max_delay=int(self.module.params["api_timeout"]),
+            )
+            self.metrics.record_retry(status=info["status"], delay=delay)
+            time.sleep(delay)
         else:
             self.module.fail_json(
                 msg='Failure while calling the Vultr API v2 with %s for "%s" with %s retries' % (method, path, retry + 1),
                 fetch_url_info=info,
             )
 
+        if conditional:
+            if info["status"] == 304:
+                # Not modified, use the body of the revalidated response
+                cached_body = VALIDATOR_CACHE.get_body(url)
+                if cached_body is not None:
+                    self.metrics.record_not_modified()
+                    info["status"] = 200
+                    resp_body = cached_body
+            elif info["status"] == 200:
+                VALIDATOR_CACHE.store(url, info, resp_body)
+
+        if memoize:
+            if info["status"] == 200:
+                RESPONSE_MEMO.store(url, resp_body)
+        elif method != "GET":
+            RESPONSE_MEMO.invalidate(url)
+
         # Success with content
         if info["status"] in (200, 201, 202):
-            return self.module.from_json(to_text(resp_body, errors="surrogate_or_strict"))
+            return self.module.from_json(to_text(resp_body, errors="surrogate_or_strict")), len(resp_body)
 
         # Success without content
         if info["status"] in (404, 204):
-            return dict()
+            return dict(), 0
 
         self.module.fail_json(
             msg='Failure while calling the Vultr API v2 with %s for "%s".' % (method, path),
@@ -246,15 +926,28 @@ class AnsibleVultr:
         get_details=False,
         fail_not_found=False,
         skip_transform=True,
+        unique=False,
     ):
+        # With unique, the first match is returned without checking for duplicates,
+        # use it only if the API guarantees at most one match.
         param_value = self.module.params.get(param_key or key_name)
+        region_param = self.module.params.get("region")
+
+        # Let the API do the filtering where supported, results are verified below
+        server_side_filters = self.SERVER_SIDE_FILTERS.get(path, dict())
+        filter_params = dict()
+        if key_name in server_side_filters and param_value is not None:
+            filter_params[server_side_filters[key_name]] = param_value
+        if "region" in server_side_filters and region_param:
+            filter_params[server_side_filters["region"]] = region_param
+        if filter_params:
+            query_params = dict_merge(query_params or dict(), filter_params)
 
         found = dict()
-        for resource in self.query_list(path=path, result_key=result_key, query_params=query_params):
+        for resource in self.query_list_iter(path=path, result_key=result_key, query_params=query_params):
             if resource.get(key_name) == param_value:
                 # In case the resource has a region, distinguish between the region
                 # This allows to have identical identifiers (e.g. names) per region
-                region_param = self.module.params.get("region")
                 region_resource = resource.get("region")
                 if region_resource and region_param and (region_param != region_resource):
                     continue
@@ -268,6 +961,8 @@ class AnsibleVultr:
                     self.module.fail_json(msg=msg)
 
                 found = resource
+                if unique:
+                    break
 
         if found:
             if get_details:
@@ -327,13 +1022,41 @@ class AnsibleVultr:
         )
         return resources[result_key] if resources else []
 
-    def wait_for_state(self, resource, key, states, cmp="=", retries=60, skip_wait=False):
+    def query_list_iter(self, path=None, result_key=None, query_params=None):
+        # Like query_list, but yields the resources page by page
+        return self.paginate_api_query_iter(
+            path=path or self.resource_path,
+            query_params=query_params,
+            result_key=result_key or self.resource_result_key_plural,
+        )
+
+    def poll(self, timeout, hint=None):
+        """
+        Like poll(), the time spent is recorded as wait time in the metrics.
+        Memoized responses are not used while polling.
+        """
+        start = time.time()
+        self._polling += 1
+        try:
+            for dummy in poll(timeout=timeout, hint=hint):
+                yield
+        finally:
+            self._polling -= 1
+            self.metrics.record_wait(time.time() - start)
+
+    def wait_for_state(self, resource, key, states, cmp="=", timeout=None, poll_hint=None, skip_wait=False):
         if skip_wait:
             return resource
 
+        if timeout is None:
+            timeout = self.module.params.get("wait_timeout")
+        if timeout is None:
+            timeout = 600
+
         resource_id = resource[self.resource_key_id]
-        for retry in range(0, retries):
-            resource = self.query_by_id(resource_id=resource_id, skip_transform=False)
+        for dummy in self.poll(timeout=timeout, hint=poll_hint):
+            # Transform only the final resource, not every polled one
+            resource = self.query_by_id(resource_id=resource_id)
             if resource and key in resource:
                 if cmp == "=":
                     if resource[key] in states:
@@ -341,7 +1064,6 @@ class AnsibleVultr:
                 else:
                     if resource[key] not in states:
                         break
-            backoff(retry=retry)
         else:
             if cmp == "=":
                 msg = "Wait for %s to become one in %s timed out" % (key, states)
@@ -349,7 +1071,7 @@ class AnsibleVultr:
                 msg = "Wait for %s to not be in %s timed out" % (key, states)
             self.module.fail_json(msg=msg)
 
-        return resource
+        return self.transform_resource(resource)
 
     def create_or_update(self):
         resource = self.query()
@@ -51,20 +51,93 @@ vultr_api:
       type: int
       sample: 5
     api_retry_max_delay:
-      description: Exponential backoff delay in seconds between retries up to this max delay value.
+      description: Randomized backoff delay in seconds between retries up to this max delay value.
       returned: success
       type: int
       sample: 12
     api_results_per_page:
-      description: Number of results returned per call to API.
+      description: Number of results returned per call to API or C(auto).
       returned: success
-      type: int
+      type: raw
       sample: 100
     api_endpoint:
       description: Endpoint used for the API requests.
       returned: success
       type: str
       sample: "https://api.vultr.com/v2"
+    metrics:
+      description:
+        - Metrics of the API requests sent by the module.
+        - Times are in seconds.
+      returned: success
+      type: dict
+      version_added: 1.15.0
+      contains:
+        requests:
+          description: Amount of API requests, including retries.
+          returned: success
+          type: int
+          sample: 4
+        requests_by_path:
+          description: Amount of API requests by method and path, IDs in paths replaced by C({id}).
+          returned: success
+          type: dict
+          sample: {"GET /instances": 1, "GET /instances/{id}": 3}
+        bytes_sent:
+          description: Total bytes of the request bodies.
+          returned: success
+          type: int
+          sample: 0
+        bytes_received:
+          description: Total bytes of the response bodies as transferred, compressed if the API compressed them.
+          returned: success
+          type: int
+          sample: 5321
+        not_modified:
+          description: Amount of API requests answered by 304 Not Modified, see I(api_conditional_requests).
+          returned: success
+          type: int
+          sample: 0
+        memoized:
+          description: Amount of API reads answered by a response read before in the module run, without a request.
+          returned: success
+          type: int
+          sample: 1
+        retries:
+          description: Amount of retried API requests.
+          returned: success
+          type: int
+          sample: 1
+        rate_limited:
+          description: Amount of API requests retried because of 429 Too Many Requests.
+          returned: success
+          type: int
+          sample: 1
+        backoff_time:
+          description: Time slept before retrying API requests.
+          returned: success
+          type: float
+          sample: 1.2
+        rate_limit_time:
+          description: Time waited for the client side rate limit, see I(api_rate_limit).
+          returned: success
+          type: float
+          sample: 0.0
+        wait_time:
+          description: Time spent waiting for resources to reach a state.
+          returned: success
+          type: float
+          sample: 32.5
+        latency_p50:
+          description: Median latency of the API requests.
+          returned: success
+          type: float
+          sample: 0.182
+        latency_p95:
+          description: 95th percentile latency of the API requests.
+          returned: success
+          type: float
+          sample: 0.41
 vultr_block_storage_info:
   description: Response from Vultr API as list.
   returned: success
@@ -126,6 +126,12 @@ options:
     type: bool
     default: false
     version_added: "1.13.0"
+  wait_timeout:
+    description:
+      - Max. time in seconds to wait for the instance to reach the desired state.
+    type: int
+    default: 3600
+    version_added: "1.15.0"
   state:
     description:
       - State of the instance.
@@ -217,20 +223,93 @@ vultr_api:
       type: int
       sample: 5
     api_retry_max_delay:
-      description: Exponential backoff delay in seconds between retries up to this max delay value.
+      description: Randomized backoff delay in seconds between retries up to this max delay value.
       returned: success
       type: int
       sample: 12
     api_results_per_page:
-      description: Number of results returned per call to API.
+      description: Number of results returned per call to API or C(auto).
       returned: success
-      type: int
+      type: raw
       sample: 100
     api_endpoint:
       description: Endpoint used for the API requests.
       returned: success
       type: str
       sample: "https://api.vultr.com/v2"
+    metrics:
+      description:
+        - Metrics of the API requests sent by the module.
+        - Times are in seconds.
+      returned: success
+      type: dict
+      version_added: 1.15.0
+      contains:
+        requests:
+          description: Amount of API requests, including retries.
+          returned: success
+          type: int
+          sample: 4
+        requests_by_path:
+          description: Amount of API requests by method and path, IDs in paths replaced by C({id}).
+          returned: success
+          type: dict
+          sample: {"GET /instances": 1, "GET /instances/{id}": 3}
+        bytes_sent:
+          description: Total bytes of the request bodies.
+          returned: success
+          type: int
+          sample: 0
+        bytes_received:
+          description: Total bytes of the response bodies as transferred, compressed if the API compressed them.
+          returned: success
+          type: int
+          sample: 5321
+        not_modified:
+          description: Amount of API requests answered by 304 Not Modified, see I(api_conditional_requests).
+          returned: success
+          type: int
+          sample: 0
+        memoized:
+          description: Amount of API reads answered by a response read before in the module run, without a request.
+          returned: success
+          type: int
+          sample: 1
+        retries:
+          description: Amount of retried API requests.
+          returned: success
+          type: int
+          sample: 1
+        rate_limited:
+          description: Amount of API requests retried because of 429 Too Many Requests.
+          returned: success
+          type: int
+          sample: 1
+        backoff_time:
+          description: Time slept before retrying API requests.
+          returned: success
+          type: float
+          sample: 1.2
+        rate_limit_time:
+          description: Time waited for the client side rate limit, see I(api_rate_limit).
+          returned: success
+          type: float
+          sample: 0.0
+        wait_time:
+          description: Time spent waiting for resources to reach a state.
+          returned: success
+          type: float
+          sample: 32.5
+        latency_p50:
+          description: Median latency of the API requests.
+          returned: success
+          type: float
+          sample: 0.182
+        latency_p95:
+          description: 95th percentile latency of the API requests.
+          returned: success
+          type: float
+          sample: 0.41
 vultr_instance:
   description: Response from Vultr API.
   returned: success
@@ -437,7 +516,7 @@ vultr_instance:
 from ansible.module_utils.basic import AnsibleModule
 
 from ..module_utils.common_instance import AnsibleVultrCommonInstance
-from ..module_utils.vultr_v2 import backoff, vultr_argument_spec
+from ..module_utils.vultr_v2 import vultr_argument_spec
 
 
 class AnsibleVultrInstance(AnsibleVultrCommonInstance):
@@ -504,46 +583,16 @@ class AnsibleVultrInstance(AnsibleVultrCommonInstance):
 
         return resource
 
-    def do_update(self, data, resource):
-        resp = self.api_query(
-            path="%s/%s" % (self.resource_path, resource[self.resource_key_id]),
-            method=self.resource_update_method,
-            data=data,
-        )
-
-        # Not properly documented, but visible in the Response sample:
-        # https://www.vultr.com/api/#tag/instances/operation/update-instance
-
-        in_process_jobs = []
-        if resp:
-            job_ids = resp.get("job_ids", [])
-            for job in job_ids:
-                job_resp = self.api_query(path="%s/jobs/%s" % (self.resource_path, job))
-                if job_resp and job_resp.get("state") == "processing":
-                    in_process_jobs.append(job)
-
-        if len(in_process_jobs) > 0:
-            for job in in_process_jobs:
-                self.wait_for_instance_job(job)
-
-        return self.query_by_id(resource_id=resource[self.resource_key_id])
-
-    def wait_for_instance_job(self, job_id, retries=120):
-        for retry in range(0, retries):
-            resp = self.api_query(path="%s/jobs/%s" % (self.resource_path, job_id))
-            if resp and resp.get("state") == "success":
-                break
-            backoff(retry=retry)
-        else:
-            self.module.fail_json(msg="Wait for instance update completion timed out")
+    def get_lookups(self):
+        lookups = super(AnsibleVultrInstance, self).get_lookups()
+        if self.module.params.get("firewall_group") is not None:
+            lookups.append(("firewall_group_id", lambda: self.get_firewall_group()["id"]))
+        return lookups
 
     def configure(self):
         super(AnsibleVultrInstance, self).configure()
 
         if self.module.params["state"] != "absent":
-            if self.module.params.get("firewall_group") is not None:
-                self.module.params["firewall_group_id"] = self.get_firewall_group()["id"]
-
             if self.module.params.get("backups") is not None:
                 self.module.params["backups"] = "enabled" if self.module.params["backups"] else "disabled"
 
@@ -582,6 +631,7 @@ def main():
             region=dict(type="str", required=True),
             user_scheme=dict(type="str", choices=["root", "limited"]),
             skip_wait=dict(type="bool", default=False),
+            wait_timeout=dict(type="int", default=3600),
             state=dict(
                 choices=[
                     "present",
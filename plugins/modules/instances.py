@@ -0,0 +1,680 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = """
+---
+module: instances
+short_description: Manages many server instances at once on Vultr.
+description:
+  - Create, update and delete a list of server instances on Vultr in one task.
+  - Referenced resources, e.g. OS, SSH keys or VPCs, are resolved once for all instances.
+  - Instances are created and updated concurrently and waited for with a single list request per poll.
+  - Use M(vultr.cloud.instance) to start, stop, restart or reinstall instances.
+version_added: "1.15.0"
+author:
+  - "René Moser (@resmo)"
+options:
+  instances:
+    description:
+      - List of instances, identified by I(label) and I(region).
+      - The options have the same meaning as the options of M(vultr.cloud.instance).
+    type: list
+    elements: dict
+    required: true
+    suboptions:
+      label:
+        description:
+          - Name of the instance.
+        required: true
+        aliases: [ name ]
+        type: str
+      region:
+        description:
+          - Region the instance is deployed into.
+        type: str
+        required: true
+      hostname:
+        description:
+          - The hostname to assign to this instance.
+        type: str
+      os:
+        description:
+          - The operating system name.
+          - Mutually exclusive with I(image), I(app) and I(snapshot).
+        type: str
+      app:
+        description:
+          - The app deploy name of Vultr OneClick apps.
+          - Mutually exclusive with I(image), I(os) and I(snapshot).
+        type: str
+      image:
+        description:
+          - The image deploy name of Vultr Marketplace apps.
+          - Mutually exclusive with I(os), I(app) and I(snapshot).
+        type: str
+      snapshot:
+        description:
+          - Description or ID of the snapshot.
+          - Only considered while creating the instance.
+        type: str
+      firewall_group:
+        description:
+          - The firewall group description to assign this instance to.
+        type: str
+      plan:
+        description:
+          - The plan name to use for the instance.
+          - Required if the instance does not yet exist.
+        type: str
+      activation_email:
+        description:
+          - Whether to send an activation email when the instance is ready or not.
+          - Only considered on creation.
+        type: bool
+        default: false
+      backups:
+        description:
+          - Whether to enable automatic backups or not.
+        type: bool
+      ddos_protection:
+        description:
+          - Whether to enable ddos_protection or not.
+        type: bool
+      enable_ipv6:
+        description:
+          - Whether to enable IPv6 or not.
+        type: bool
+      tags:
+        description:
+          - Tags for the instance.
+        type: list
+        elements: str
+      user_data:
+        description:
+          - User data to be passed to the instance.
+        type: str
+      user_scheme:
+        description:
+          - The user scheme used as login user (Linux-only).
+          - Only considered while creating the instance.
+        type: str
+        choices: [ root, limited ]
+      startup_script:
+        description:
+          - Name or ID of the startup script to execute on boot.
+          - Only considered while creating the instance.
+        type: str
+      ssh_keys:
+        description:
+          - List of SSH key names passed to the instance on creation.
+        type: list
+        elements: str
+      reserved_ipv4:
+        description:
+          - IP address of the floating IP to use as the main IP of this instance.
+          - Only considered on creation.
+        type: str
+      vpcs:
+        description:
+          - A list of VPCs identified by their description to be assigned to the instance.
+        type: list
+        elements: str
+  parallelism:
+    description:
+      - Max. amount of instances created, updated or deleted concurrently.
+    type: int
+    default: 10
+  skip_wait:
+    description:
+      - Whether to skip the wait for the instances to be completely ready for access.
+    type: bool
+    default: false
+  wait_timeout:
+    description:
+      - Max. time in seconds to wait for the instances to reach the desired state.
+    type: int
+    default: 3600
+    version_added: "1.15.0"
+  state:
+    description:
+      - State of the instances.
+    default: present
+    choices: [ present, absent ]
+    type: str
+extends_documentation_fragment:
+  - vultr.cloud.vultr_v2
+"""
+
+EXAMPLES = """
+---
+- name: Create three web servers at once
+  vultr.cloud.instances:
+    instances:
+      - label: web1
+        region: ams
+        plan: vc2-1c-2gb
+        os: Debian 12 x64 (bookworm)
+        ssh_keys:
+          - my ssh key
+        firewall_group: my firewall group
+        tags:
+          - web
+      - label: web2
+        region: ams
+        plan: vc2-1c-2gb
+        os: Debian 12 x64 (bookworm)
+        ssh_keys:
+          - my ssh key
+        firewall_group: my firewall group
+        tags:
+          - web
+      - label: web3
+        region: fra
+        plan: vc2-1c-2gb
+        os: Debian 12 x64 (bookworm)
+        ssh_keys:
+          - my ssh key
+        firewall_group: my firewall group
+        tags:
+          - web
+
+- name: Create instances with individual specs
+  vultr.cloud.instances:
+    parallelism: 5
+    instances:
+      - label: db1
+        region: fra
+        plan: vc2-2c-4gb
+        os: Debian 12 x64 (bookworm)
+      - label: git
+        region: ams
+        plan: vc2-1c-2gb
+        image: Gitea on Ubuntu 20.04
+
+- name: Delete instances
+  vultr.cloud.instances:
+    instances:
+      - label: web1
+        region: ams
+      - label: web2
+        region: ams
+    state: absent
+"""
+
+RETURN = """
+---
+vultr_api:
+  description: Response from Vultr API with a few additions/modification.
+  returned: success
+  type: dict
+  contains:
+    api_timeout:
+      description: Timeout used for the API requests.
+      returned: success
+      type: int
+      sample: 60
+    api_retries:
+      description: Amount of max retries for the API requests.
+      returned: success
+      type: int
+      sample: 5
+    api_retry_max_delay:
+      description: Randomized backoff delay in seconds between retries up to this max delay value.
+      returned: success
+      type: int
+      sample: 12
+    api_results_per_page:
+      description: Number of results returned per call to API or C(auto).
+      returned: success
+      type: raw
+      sample: 100
+    api_endpoint:
+      description: Endpoint used for the API requests.
+      returned: success
+      type: str
+      sample: "https://api.vultr.com/v2"
+    metrics:
+      description:
+        - Metrics of the API requests sent by the module.
+        - Times are in seconds.
+      returned: success
+      type: dict
+      version_added: 1.15.0
+      contains:
+        requests:
+          description: Amount of API requests, including retries.
+          returned: success
+          type: int
+          sample: 4
+        requests_by_path:
+          description: Amount of API requests by method and path, IDs in paths replaced by C({id}).
+          returned: success
+          type: dict
+          sample: {"GET /instances": 1, "GET /instances/{id}": 3}
+        bytes_sent:
+          description: Total bytes of the request bodies.
+          returned: success
+          type: int
+          sample: 0
+        bytes_received:
+          description: Total bytes of the response bodies as transferred, compressed if the API compressed them.
+          returned: success
+          type: int
+          sample: 5321
+        not_modified:
+          description: Amount of API requests answered by 304 Not Modified, see I(api_conditional_requests).
+          returned: success
+          type: int
+          sample: 0
+        memoized:
+          description: Amount of API reads answered by a response read before in the module run, without a request.
+          returned: success
+          type: int
+          sample: 1
+        retries:
+          description: Amount of retried API requests.
+          returned: success
+          type: int
+          sample: 1
+        rate_limited:
+          description: Amount of API requests retried because of 429 Too Many Requests.
+          returned: success
+          type: int
+          sample: 1
+        backoff_time:
+          description: Time slept before retrying API requests.
+          returned: success
+          type: float
+          sample: 1.2
+        rate_limit_time:
+          description: Time waited for the client side rate limit, see I(api_rate_limit).
+          returned: success
+          type: float
+          sample: 0.0
+        wait_time:
+          description: Time spent waiting for resources to reach a state.
+          returned: success
+          type: float
+          sample: 32.5
+        latency_p50:
+          description: Median latency of the API requests.
+          returned: success
+          type: float
+          sample: 0.182
+        latency_p95:
+          description: 95th percentile latency of the API requests.
+          returned: success
+          type: float
+          sample: 0.41
+vultr_instances:
+  description:
+    - Response from Vultr API as list, in the order of I(instances).
+    - Instances not yet existing in check mode are returned as empty dict.
+    - See M(vultr.cloud.instance) for the returned keys.
+  returned: success
+  type: list
+  elements: dict
+  sample: [
+    {
+      "id": "cb676a46-66fd-4dfb-b839-443f2e6c0b60",
+      "label": "web1",
+      "region": "ams",
+      "plan": "vc2-1c-2gb",
+      "main_ip": "95.179.189.95",
+      "status": "active",
+      "server_status": "ok",
+      "power_status": "running",
+      "tags": [ "web" ]
+    }
+  ]
+"""
+
+import functools
+import threading
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.common_instance import AnsibleVultrCommonInstance
+from ..module_utils.vultr_v2 import AnsibleVultr, vultr_argument_spec
+
+INSTANCE_CREATE_PARAM_KEYS = [
+    "label",
+    "hostname",
+    "plan",
+    "app_id",
+    "os_id",
+    "image_id",
+    "snapshot_id",
+    "script_id",
+    "region",
+    "enable_ipv6",
+    "reserved_ipv4",
+    "firewall_group_id",
+    "user_data",
+    "tags",
+    "activation_email",
+    "ddos_protection",
+    "sshkey_id",
+    "backups",
+    "attach_vpc",
+    "user_scheme",
+]
+
+INSTANCE_UPDATE_PARAM_KEYS = [
+    "plan",
+    "tags",
+    "firewall_group_id",
+    "enable_ipv6",
+    "ddos_protection",
+    "backups",
+    "user_data",
+    "attach_vpc",
+    "detach_vpc",
+]
+
+
+class AnsibleVultrInstanceSpecModule:
+    """
+    Module facade exposing the params of a single instance spec.
+    """
+
+    def __init__(self, module, params):
+        self.module = module
+        self.params = params
+
+    def __getattr__(self, name):
+        return getattr(self.module, name)
+
+    # Resolved at call time, the module methods may be replaced while running concurrently
+    def fail_json(self, **kwargs):
+        return self.module.fail_json(**kwargs)
+
+    def exit_json(self, **kwargs):
+        return self.module.exit_json(**kwargs)
+
+
+class AnsibleVultrInstanceSpec(AnsibleVultrCommonInstance):
+    # Lists of the lookups, the same for all specs
+    SHARED_LIST_PATHS = (
+        "/applications",
+        "/firewalls",
+        "/os",
+        "/snapshots",
+        "/ssh-keys",
+        "/startup-scripts",
+        "/vpc2",
+        "/vpcs",
+    )
+
+    def __init__(self, shared_lists, shared_lists_lock, metrics, *args, **kwargs):
+        # Lists queried for lookups and API metrics, shared by all specs
+        self.shared_lists = shared_lists
+        self.shared_lists_lock = shared_lists_lock
+        self.metrics = metrics
+        super(AnsibleVultrInstanceSpec, self).__init__(*args, **kwargs)
+
+    def query_list(self, path=None, result_key=None, query_params=None):
+        if path not in self.SHARED_LIST_PATHS:
+            return super(AnsibleVultrInstanceSpec, self).query_list(path=path, result_key=result_key, query_params=query_params)
+
+        key = (path, result_key, tuple(sorted((query_params or dict()).items())))
+        # Held while querying, specs running concurrently wait for the list instead of querying it again
+        with self.shared_lists_lock:
+            if key not in self.shared_lists:
+                self.shared_lists[key] = super(AnsibleVultrInstanceSpec, self).query_list(
+                    path=path,
+                    result_key=result_key,
+                    query_params=query_params,
+                )
+            return self.shared_lists[key]
+
+    def query_list_iter(self, path=None, result_key=None, query_params=None):
+        if path not in self.SHARED_LIST_PATHS:
+            return super(AnsibleVultrInstanceSpec, self).query_list_iter(path=path, result_key=result_key, query_params=query_params)
+        return iter(self.query_list(path=path, result_key=result_key, query_params=query_params))
+
+    def get_lookups(self):
+        lookups = super(AnsibleVultrInstanceSpec, self).get_lookups()
+        if self.module.params.get("firewall_group") is not None:
+            lookups.append(("firewall_group_id", lambda: self.get_firewall_group()["id"]))
+        return lookups
+
+    def configure(self):
+        super(AnsibleVultrInstanceSpec, self).configure()
+
+        if self.module.params["state"] != "absent":
+            if self.module.params.get("backups") is not None:
+                self.module.params["backups"] = "enabled" if self.module.params["backups"] else "disabled"
+
+    def create(self):
+        if self.module.params.get("plan") is None:
+            self.module.fail_json(msg="missing required arguments for instance %s: plan" % self.module.params["label"])
+        return super(AnsibleVultrInstanceSpec, self).create()
+
+
+class AnsibleVultrInstances(AnsibleVultr):
+    def configure(self):
+        if self.module.params["parallelism"] < 1:
+            self.module.fail_json(msg="parallelism must be greater than 0, got: %s" % self.module.params["parallelism"])
+
+        shared_lists = dict()
+        shared_lists_lock = threading.Lock()
+        self.specs = list()
+
+        api_params = dict((k, v) for k, v in self.module.params.items() if k.startswith("api_") or k == "validate_certs")
+
+        seen = set()
+        for instance in self.module.params["instances"]:
+            key = (instance["label"], instance["region"])
+            if key in seen:
+                self.module.fail_json(msg="Instance with label=%s in region=%s listed more than once." % key)
+            seen.add(key)
+
+            params = dict(api_params)
+            params.update(instance)
+            params["state"] = self.module.params["state"]
+            # Waiting for the jobs of plan, OS and app changes
+            params["wait_timeout"] = self.module.params["wait_timeout"]
+
+            # Only enrich resources with VPCs if the spec manages VPCs
+            if params.get("vpcs") is None:
+                params.pop("vpcs", None)
+
+            self.specs.append(
+                AnsibleVultrInstanceSpec(
+                    shared_lists=shared_lists,
+                    shared_lists_lock=shared_lists_lock,
+                    metrics=self.metrics,
+                    module=AnsibleVultrInstanceSpecModule(module=self.module, params=params),
+                    namespace=self.namespace,
+                    resource_path=self.resource_path,
+                    resource_result_key_singular=self.resource_result_key_singular,
+                    resource_create_param_keys=INSTANCE_CREATE_PARAM_KEYS,
+                    resource_update_param_keys=INSTANCE_UPDATE_PARAM_KEYS,
+                    resource_key_name="label",
+                )
+            )
+
+    def get_list_query_params(self):
+        # Let the API filter by region if all instances are in the same region
+        regions = set(spec.module.params["region"] for spec in self.specs)
+        if len(regions) == 1:
+            return dict(region=regions.pop())
+        return None
+
+    def get_existing(self):
+        # Returns a dict of existing instances by (label, region), listed once
+        existing = dict()
+        for resource in self.query_list_iter(query_params=self.get_list_query_params()):
+            key = (resource.get("label"), resource.get("region"))
+            existing.setdefault(key, list()).append(resource)
+
+        result = dict()
+        for spec in self.specs:
+            key = (spec.module.params["label"], spec.module.params["region"])
+            resources = existing.get(key, list())
+            if len(resources) > 1:
+                self.module.fail_json(msg="More than one instance with label=%s in region=%s found, labels must be unique per region." % key)
+            result[key] = resources[0] if resources else dict()
+        return result
+
+    def wait_for_instances(self, resource_ids, ready, poll_hint=None):
+        """
+        Waits until all instances are ready, using one list request per poll.
+        Returns a dict of the ready instances by ID.
+        """
+        pending = set(resource_ids)
+        resources = dict()
+        for dummy in self.poll(timeout=self.module.params["wait_timeout"], hint=poll_hint):
+            for resource in self.query_list_iter(query_params=self.get_list_query_params()):
+                if resource["id"] in pending and ready(resource):
+                    pending.remove(resource["id"])
+                    resources[resource["id"]] = resource
+
+            if not pending:
+                break
+        else:
+            self.module.fail_json(msg="Wait for instances %s to become ready timed out" % ", ".join(sorted(pending)))
+
+        return resources
+
+    def spec_update(self, spec, resource):
+        return spec.update(spec.transform_resource(resource))
+
+    def spec_result(self, spec, resource):
+        # Same shape as the result of the instance module
+        return spec.transform_result(spec.transform_resource(resource))
+
+    def present(self):
+        existing = self.get_existing()
+
+        tasks = list()
+        for spec in self.specs:
+            resource = existing[(spec.module.params["label"], spec.module.params["region"])]
+            if resource:
+                tasks.append(functools.partial(self.spec_update, spec, resource))
+            else:
+                tasks.append(spec.create)
+
+        resources = self.run_concurrently(tasks, max_workers=self.module.params["parallelism"])
+
+        for spec in self.specs:
+            if spec.result["changed"]:
+                self.result["changed"] = True
+                self.result["diff"]["before"][spec.module.params["label"]] = spec.result["diff"]["before"]
+                self.result["diff"]["after"][spec.module.params["label"]] = spec.result["diff"]["after"]
+
+        if not self.module.check_mode and not self.module.params["skip_wait"]:
+            ready = self.wait_for_instances(
+                resource_ids=[resource["id"] for resource in resources if resource],
+                ready=lambda r: r.get("status") == "active" and r.get("server_status") not in ("none", "locked"),
+                poll_hint=self.WAIT_POLL_HINTS.get(self.resource_path) if any(spec.result["changed"] for spec in self.specs) else None,
+            )
+            resources = [ready[resource["id"]] if resource else resource for resource in resources]
+
+        resources = self.run_concurrently(
+            [functools.partial(self.spec_result, spec, resource) for spec, resource in zip(self.specs, resources)],
+            max_workers=self.module.params["parallelism"],
+        )
+        self.get_result(resources)
+
+    def absent(self):
+        existing = self.get_existing()
+        resources = [existing[(spec.module.params["label"], spec.module.params["region"])] for spec in self.specs]
+        resources = [resource for resource in resources if resource]
+
+        if resources:
+            self.result["changed"] = True
+            for resource in resources:
+                self.result["diff"]["before"][resource["label"]] = dict(**resource)
+
+            if not self.module.check_mode:
+                # Locked instances can not be deleted
+                self.wait_for_instances(
+                    resource_ids=[resource["id"] for resource in resources],
+                    ready=lambda r: r.get("server_status") not in ("none", "locked"),
+                )
+                self.run_concurrently(
+                    [
+                        functools.partial(
+                            self.api_query,
+                            path="%s/%s" % (self.resource_path, resource[self.resource_key_id]),
+                            method="DELETE",
+                        )
+                        for resource in resources
+                    ],
+                    max_workers=self.module.params["parallelism"],
+                )
+
+        self.get_result(resources)
+
+
+def main():
+    argument_spec = vultr_argument_spec()
+    argument_spec.update(
+        dict(
+            instances=dict(
+                type="list",
+                elements="dict",
+                required=True,
+                options=dict(
+                    label=dict(type="str", required=True, aliases=["name"]),
+                    region=dict(type="str", required=True),
+                    hostname=dict(type="str"),
+                    app=dict(type="str"),
+                    image=dict(type="str"),
+                    snapshot=dict(type="str"),
+                    os=dict(type="str"),
+                    plan=dict(type="str"),
+                    activation_email=dict(type="bool", default=False),
+                    ddos_protection=dict(type="bool"),
+                    backups=dict(type="bool"),
+                    enable_ipv6=dict(type="bool"),
+                    tags=dict(type="list", elements="str"),
+                    vpcs=dict(type="list", elements="str"),
+                    reserved_ipv4=dict(type="str"),
+                    firewall_group=dict(type="str"),
+                    startup_script=dict(type="str"),
+                    user_data=dict(type="str"),
+                    ssh_keys=dict(type="list", elements="str", no_log=False),
+                    user_scheme=dict(type="str", choices=["root", "limited"]),
+                ),
+                mutually_exclusive=(("os", "app", "image", "snapshot"),),
+            ),
+            parallelism=dict(type="int", default=10),
+            skip_wait=dict(type="bool", default=False),
+            wait_timeout=dict(type="int", default=3600),
+            state=dict(choices=["present", "absent"], default="present"),
+        )  # type: ignore
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+
+    vultr = AnsibleVultrInstances(
+        module=module,
+        namespace="vultr_instances",
+        resource_path="/instances",
+        resource_result_key_singular="instance",
+        resource_key_name="label",
+    )
+
+    state = module.params.get("state")  # type: ignore
+    if state == "absent":
+        vultr.absent()
+    else:
+        vultr.present()
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,12 @@ options:
       - Region where the load balancer will be created.
     required: true
     type: str
+  wait_timeout:
+    description:
+      - Max. time in seconds to wait for the load balancer to reach the desired state.
+    type: int
+    default: 600
+    version_added: "1.15.0"
   state:
     description:
       - State of the load balancer.
@@ -239,7 +245,7 @@ vultr_api:
       type: int
       sample: 5
     api_retry_max_delay:
-      description: Exponential backoff delay in seconds between retries up to this max delay value.
+      description: Randomized backoff delay in seconds between retries up to this max delay value.
       returned: success
       type: int
       sample: 12
@@ -248,6 +254,79 @@ vultr_api:
       returned: success
       type: str
       sample: "https://api.vultr.com/v2"
+    metrics:
+      description:
+        - Metrics of the API requests sent by the module.
+        - Times are in seconds.
+      returned: success
+      type: dict
+      version_added: 1.15.0
+      contains:
+        requests:
+          description: Amount of API requests, including retries.
+          returned: success
+          type: int
+          sample: 4
+        requests_by_path:
+          description: Amount of API requests by method and path, IDs in paths replaced by C({id}).
+          returned: success
+          type: dict
+          sample: {"GET /instances": 1, "GET /instances/{id}": 3}
+        bytes_sent:
+          description: Total bytes of the request bodies.
+          returned: success
+          type: int
+          sample: 0
+        bytes_received:
+          description: Total bytes of the response bodies as transferred, compressed if the API compressed them.
+          returned: success
+          type: int
+          sample: 5321
+        not_modified:
+          description: Amount of API requests answered by 304 Not Modified, see I(api_conditional_requests).
+          returned: success
+          type: int
+          sample: 0
+        memoized:
+          description: Amount of API reads answered by a response read before in the module run, without a request.
+          returned: success
+          type: int
+          sample: 1
+        retries:
+          description: Amount of retried API requests.
+          returned: success
+          type: int
+          sample: 1
+        rate_limited:
+          description: Amount of API requests retried because of 429 Too Many Requests.
+          returned: success
+          type: int
+          sample: 1
+        backoff_time:
+          description: Time slept before retrying API requests.
+          returned: success
+          type: float
+          sample: 1.2
+        rate_limit_time:
+          description: Time waited for the client side rate limit, see I(api_rate_limit).
+          returned: success
+          type: float
+          sample: 0.0
+        wait_time:
+          description: Time spent waiting for resources to reach a state.
+          returned: success
+          type: float
+          sample: 32.5
+        latency_p50:
+          description: Median latency of the API requests.
+          returned: success
+          type: float
+          sample: 0.182
+        latency_p95:
+          description: 95th percentile latency of the API requests.
+          returned: success
+          type: float
+          sample: 0.41
 vultr_load_balancer:
   description: Response from Vultr API.
   returned: success
@@ -340,7 +419,10 @@ class AnsibleVultrLoadBalancer(AnsibleVultr):
         resource = super(AnsibleVultrLoadBalancer, self).create_or_update()
         if resource:
             resource = self.wait_for_state(
-                resource=resource, key="status", states=["active"]
+                resource=resource,
+                key="status",
+                states=["active"],
+                poll_hint=self.WAIT_POLL_HINTS.get(self.resource_path),
             )
         return resource
 
@@ -351,6 +433,7 @@ def main():
         dict(
             label=dict(type="str", required=True, aliases=["name"]),
             region=dict(type="str", required=True),
+            wait_timeout=dict(type="int", default=600),
             state=dict(type="str", choices=["present", "absent"], default="present"),
             forwarding_rules=dict(
                 type="list",
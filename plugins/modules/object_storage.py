@@ -35,6 +35,12 @@ options:
       - Name of storage tier to use for object storage. Must be available for specified cluster. Required if I(state) is present.
     type: str
     default: Legacy
+  wait_timeout:
+    description:
+      - Max. time in seconds to wait for the object storage to reach the desired state.
+    type: int
+    default: 600
+    version_added: "1.15.0"
   state:
     description:
       - State of the object storage.
@@ -83,20 +89,93 @@ vultr_api:
       type: int
       sample: 5
     api_retry_max_delay:
-      description: Exponential backoff delay in seconds between retries up to this max delay value.
+      description: Randomized backoff delay in seconds between retries up to this max delay value.
       returned: success
       type: int
       sample: 12
     api_results_per_page:
-      description: Number of results returned per call to API.
+      description: Number of results returned per call to API or C(auto).
       returned: success
-      type: int
+      type: raw
       sample: 100
     api_endpoint:
       description: Endpoint used for the API requests.
       returned: success
       type: str
       sample: "https://api.vultr.com/v2"
+    metrics:
+      description:
+        - Metrics of the API requests sent by the module.
+        - Times are in seconds.
+      returned: success
+      type: dict
+      version_added: 1.15.0
+      contains:
+        requests:
+          description: Amount of API requests, including retries.
+          returned: success
+          type: int
+          sample: 4
+        requests_by_path:
+          description: Amount of API requests by method and path, IDs in paths replaced by C({id}).
+          returned: success
+          type: dict
+          sample: {"GET /instances": 1, "GET /instances/{id}": 3}
+        bytes_sent:
+          description: Total bytes of the request bodies.
+          returned: success
+          type: int
+          sample: 0
+        bytes_received:
+          description: Total bytes of the response bodies as transferred, compressed if the API compressed them.
+          returned: success
+          type: int
+          sample: 5321
+        not_modified:
+          description: Amount of API requests answered by 304 Not Modified, see I(api_conditional_requests).
+          returned: success
+          type: int
+          sample: 0
+        memoized:
+          description: Amount of API reads answered by a response read before in the module run, without a request.
+          returned: success
+          type: int
+          sample: 1
+        retries:
+          description: Amount of retried API requests.
+          returned: success
+          type: int
+          sample: 1
+        rate_limited:
+          description: Amount of API requests retried because of 429 Too Many Requests.
+          returned: success
+          type: int
+          sample: 1
+        backoff_time:
+          description: Time slept before retrying API requests.
+          returned: success
+          type: float
+          sample: 1.2
+        rate_limit_time:
+          description: Time waited for the client side rate limit, see I(api_rate_limit).
+          returned: success
+          type: float
+          sample: 0.0
+        wait_time:
+          description: Time spent waiting for resources to reach a state.
+          returned: success
+          type: float
+          sample: 32.5
+        latency_p50:
+          description: Median latency of the API requests.
+          returned: success
+          type: float
+          sample: 0.182
+        latency_p95:
+          description: 95th percentile latency of the API requests.
+          returned: success
+          type: float
+          sample: 0.41
 vultr_block_storage:
   description: Response from Vultr API.
   returned: success
@@ -170,6 +249,8 @@ class AnsibleVultrObjectStorage(AnsibleVultr):
             path="/object-storage/clusters",
             result_key="clusters",
             fail_not_found=True,
+            # Hostnames are the DNS names of the clusters
+            unique=True,
         )
 
     def get_tier(self):
@@ -184,7 +265,12 @@ class AnsibleVultrObjectStorage(AnsibleVultr):
     def create_or_update(self):
         resource = super(AnsibleVultrObjectStorage, self).create_or_update()
         if resource:
-            resource = self.wait_for_state(resource=resource, key="status", states=["active"])
+            resource = self.wait_for_state(
+                resource=resource,
+                key="status",
+                states=["active"],
+                poll_hint=self.WAIT_POLL_HINTS.get(self.resource_path),
+            )
         return resource
 
 
@@ -195,6 +281,7 @@ def main():
             label=dict(type="str", required=True, aliases=["name"]),
             cluster=dict(type="str", required=True),
             tier=dict(type="str", default="Legacy"),
+            wait_timeout=dict(type="int", default=600),
             state=dict(type="str", choices=["present", "absent"], default="present"),
         )  # type: ignore
     )
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Offline benchmarks of the modules and the inventory plugin.
+
+Every scenario runs in its own process against a freshly seeded local
+stand-in of the Vultr API v2 (see vultr_api_stub.py) and reports the
+amount of API requests, the response bytes, the wall time and the peak RSS of the process.
+
+The collection must be located in a ansible_collections/vultr/cloud
+directory, e.g. run from a checkout made by ansible-test or:
+
+    python tests/benchmark/run_benchmarks.py --latency 0.05 --rate-limit-ratio 0.05
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from vultr_api_stub import VultrApiStub
+
+COLLECTION_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+COLLECTIONS_ROOT = os.path.abspath(os.path.join(COLLECTION_DIR, "..", "..", ".."))
+
+# Name, module or "inventory", module args or inventory config
+SCENARIOS = [
+    ("instance_info", "instance_info", {}),
+    ("instance_info_label", "instance_info", {"label": "instance-42"}),
+    ("instance_info_auto_pages", "instance_info", {"api_results_per_page": "auto"}),
+    ("ssh_key_info", "ssh_key_info", {}),
+    ("vpc_info", "vpc_info", {}),
+    ("snapshot_info", "snapshot_info", {}),
+    ("os_info", "os_info", {}),
+    ("ssh_key_create", "ssh_key", {"name": "key-new", "ssh_key": "ssh-ed25519 AAAA key-new"}),
+    ("dns_record_unchanged", "dns_record", {"domain": "example-0.com", "name": "host-19", "data": "192.0.2.20"}),
+    ("dns_record_create", "dns_record", {"domain": "example-0.com", "name": "host-new", "data": "192.0.2.200"}),
+    ("firewall_rule_create", "firewall_rule", {"group": "firewall-1", "port": "8080", "subnet": "0.0.0.0", "subnet_size": 0}),
+    (
+        "instance_create",
+        "instance",
+        {"label": "bench-0", "region": "ams", "plan": "vc2-1c-1gb", "os": "Debian 12 x64 (bookworm)", "ssh_keys": ["key-1"]},
+    ),
+    (
+        "instance_unchanged",
+        "instance",
+        {"label": "instance-42", "region": "ams", "plan": "vc2-1c-1gb", "os": "Debian 12 x64 (bookworm)"},
+    ),
+    (
+        "instances_create",
+        "instances",
+        {
+            "instances": [
+                {"label": "bench-%d" % i, "region": "ams", "plan": "vc2-1c-1gb", "os": "Debian 12 x64 (bookworm)", "ssh_keys": ["key-1"]}
+                for i in range(10)
+            ]
+        },
+    ),
+    ("inventory", "inventory", {}),
+    ("inventory_bare_metal", "inventory", {"instance_type": ["cloud", "bare_metal"]}),
+    ("inventory_auto_pages", "inventory", {"api_results_per_page": "auto"}),
+]
+
+
+def get_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([COLLECTIONS_ROOT] + [p for p in [env.get("PYTHONPATH")] if p])
+    env["ANSIBLE_COLLECTIONS_PATH"] = COLLECTIONS_ROOT
+    env["ANSIBLE_INVENTORY_ENABLED"] = "vultr.cloud.vultr"
+    env.pop("VULTR_API_KEY", None)
+    return env
+
+
+def get_command(module, args, api_endpoint, work_dir):
+    if module == "inventory":
+        config = dict(plugin="vultr.cloud.vultr", api_key="BENCHMARK", api_endpoint=api_endpoint, validate_certs=False)
+        config.update(args)
+        config_path = os.path.join(work_dir, "vultr.yml")
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+        return [sys.executable, "-m", "ansible.cli.inventory", "-i", config_path, "--list"]
+
+    args = dict(args, api_key="BENCHMARK", api_endpoint=api_endpoint, validate_certs=False)
+    args_path = os.path.join(work_dir, "args.json")
+    with open(args_path, "w") as f:
+        json.dump({"ANSIBLE_MODULE_ARGS": args}, f)
+    return [sys.executable, "-m", "ansible_collections.vultr.cloud.plugins.modules.%s" % module, args_path]
+
+
+def get_error(module, returncode, stdout, stderr):
+    if module != "inventory":
+        try:
+            result = json.loads(stdout)
+        except ValueError:
+            return (stderr or stdout).strip().splitlines()[-1:] or "no output"
+        return result.get("msg") if result.get("failed") else None
+    return stderr.strip().splitlines()[-1] if returncode else None
+
+
+def run_scenario(name, module, args, options):
+    stub = VultrApiStub(
+        latency=options.latency,
+        rate_limit_ratio=options.rate_limit_ratio,
+        transition_time=options.transition_time,
+    )
+    stub.seed(instances=options.instances, bare_metals=options.instances // 10)
+    api_endpoint = stub.start()
+
+    work_dir = tempfile.mkdtemp(prefix="vultr-benchmark-")
+    try:
+        command = get_command(module, args, api_endpoint, work_dir)
+        with open(os.path.join(work_dir, "stdout"), "w+") as stdout, open(os.path.join(work_dir, "stderr"), "w+") as stderr:
+            start = time.time()
+            process = subprocess.Popen(command, stdout=stdout, stderr=stderr, env=get_env(), cwd=work_dir)
+            # wait4() returns the resource usage of this process only
+            dummy, status, rusage = os.wait4(process.pid, 0)
+            wall_time = time.time() - start
+            process.returncode = os.waitstatus_to_exitcode(status) if hasattr(os, "waitstatus_to_exitcode") else status
+
+            stdout.seek(0)
+            stderr.seek(0)
+            error = get_error(module, process.returncode, stdout.read(), stderr.read())
+    finally:
+        stub.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    # ru_maxrss is in KiB on Linux, in bytes on macOS
+    peak_rss = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+    return {
+        "name": name,
+        "requests": len(stub.requests),
+        "rate_limited": stub.rate_limited,
+        "received_kib": round(stub.bytes_sent / 1024.0, 1),
+        "wall_time": round(wall_time, 3),
+        "peak_rss_mib": round(peak_rss / 1024.0 / 1024.0, 1),
+        "error": error,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the vultr.cloud collection.")
+    parser.add_argument("--instances", type=int, default=500, help="instances seeded into the API stand-in")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every API request")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="ratio of API requests answered by 429")
+    parser.add_argument("--transition-time", type=float, default=1.0, help="seconds until created resources are ready")
+    parser.add_argument("--scenario", action="append", help="run only the scenarios containing this name")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    options = parser.parse_args()
+
+    if not COLLECTION_DIR.endswith(os.path.join("ansible_collections", "vultr", "cloud")):
+        parser.error("the collection must be located in ansible_collections/vultr/cloud, found %s" % COLLECTION_DIR)
+
+    results = []
+    for name, module, args in SCENARIOS:
+        if options.scenario and not any(s in name for s in options.scenario):
+            continue
+        result = run_scenario(name, module, args, options)
+        results.append(result)
+        if not options.json:
+            print(
+                "%-24s %6d requests %4d 429s %9.1f KiB %8.3fs %7.1f MiB%s"
+                % (
+                    result["name"],
+                    result["requests"],
+                    result["rate_limited"],
+                    result["received_kib"],
+                    result["wall_time"],
+                    result["peak_rss_mib"],
+                    "  FAILED: %s" % result["error"] if result["error"] else "",
+                )
+            )
+
+    if options.json:
+        print(json.dumps(results, indent=2))
+
+    return 1 if any(result["error"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Local stand-in for the Vultr API v2, used by the benchmarks.
+
+Implements the subset of the API used by the collection for instances,
+bare metals, SSH keys, VPCs, DNS domains and records, firewall groups and
+rules and snapshots, as well as the OS, plans and regions catalogs:
+
+- cursor based pagination honouring per_page
+- filtering of lists by query parameters matching resource fields
+- a configurable latency per request
+- injected 429 Too Many Requests responses with a Retry-After header
+- asynchronous state transitions, e.g. instances become active after a delay
+- ETag validators and 304 Not Modified responses to conditional GET requests
+- gzip or deflate encoded responses as negotiated by Accept-Encoding
+
+Run it standalone with `python vultr_api_stub.py --port 8080` or use
+`VultrApiStub` from Python.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Collections by path segment: key in list responses, key in single responses, ID field
+COLLECTIONS = {
+    "instances": ("instances", "instance", "id"),
+    "bare-metals": ("bare_metals", "bare_metal", "id"),
+    "ssh-keys": ("ssh_keys", "ssh_key", "id"),
+    "vpcs": ("vpcs", "vpc", "id"),
+    "domains": ("domains", "domain", "domain"),
+    "firewalls": ("firewall_groups", "firewall_group", "id"),
+    "snapshots": ("snapshots", "snapshot", "id"),
+    "os": ("os", "os", "id"),
+    "plans": ("plans", "plan", "id"),
+    "regions": ("regions", "region", "id"),
+}
+
+# Nested collections by parent and path segment
+NESTED_COLLECTIONS = {
+    ("domains", "records"): ("records", "record", "id"),
+    ("firewalls", "rules"): ("firewall_rules", "firewall_rule", "id"),
+}
+
+# Read only sub resources of instances and bare metals
+SUB_RESOURCES = {
+    "user-data": {"user_data": {"data": ""}},
+    "vpcs": {"vpcs": [], "meta": {"total": 0, "links": {"next": "", "prev": ""}}},
+    "vpc2": {"vpcs": [], "meta": {"total": 0, "links": {"next": "", "prev": ""}}},
+}
+
+# Fields of created resources changing after the transition time: field: (initial, final)
+TRANSITIONS = {
+    "instances": {"status": ("pending", "active"), "server_status": ("none", "ok"), "power_status": ("stopped", "running")},
+    "bare-metals": {"status": ("pending", "active"), "power_status": ("stopped", "running")},
+    "snapshots": {"status": ("pending", "complete")},
+}
+
+# Fields of created resources by collection
+DEFAULTS = {
+    "instances": {
+        "os": "Debian 12 x64 (bookworm)",
+        "ram": 1024,
+        "disk": 25,
+        "main_ip": "192.0.2.10",
+        "vcpu_count": 1,
+        "allowed_bandwidth": 1000,
+        "netmask_v4": "255.255.254.0",
+        "gateway_v4": "192.0.2.1",
+        "v6_network": "",
+        "v6_main_ip": "",
+        "v6_network_size": 0,
+        "hostname": "",
+        "internal_ip": "",
+        "kvm": "",
+        "os_id": 2136,
+        "app_id": 0,
+        "image_id": "",
+        "firewall_group_id": "",
+        "features": [],
+        "tags": [],
+    },
+    "bare-metals": {"os": "Debian 12 x64 (bookworm)", "main_ip": "192.0.2.20", "features": [], "tags": []},
+    "vpcs": {"v4_subnet": "10.99.0.0", "v4_subnet_mask": 24},
+}
+
+
+def encode_cursor(offset):
+    return base64.b64encode(("next__%d" % offset).encode()).decode()
+
+
+def decode_cursor(cursor):
+    return int(base64.b64decode(cursor.encode()).decode().split("__", 1)[1])
+
+
+class VultrApiStub:
+    """
+    In memory state of the stand-in and its HTTP server.
+    """
+
+    def __init__(self, latency=0.0, rate_limit_ratio=0.0, transition_time=1.0, seed=0):
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.transition_time = transition_time
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.collections = dict()
+        self.requests = []
+        self.rate_limited = 0
+        self.bytes_sent = 0
+        self.server = None
+
+    def get_collection(self, key):
+        return self.collections.setdefault(key, OrderedDict())
+
+    def add(self, key, resource, id_field="id"):
+        resource.setdefault("date_created", time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()))
+        if id_field == "id" and "id" not in resource:
+            resource["id"] = str(uuid.uuid4())
+        self.get_collection(key)[resource[id_field]] = resource
+        return resource
+
+    def seed(self, instances=100, bare_metals=0, ssh_keys=10, vpcs=5, domains=2, records=20, firewalls=3, rules=10, snapshots=5):
+        """
+        Adds a typical account.
+        """
+        self.add("os", {"id": 2136, "name": "Debian 12 x64 (bookworm)", "arch": "x64", "family": "debian"})
+        self.add("os", {"id": 1743, "name": "Ubuntu 22.04 LTS x64", "arch": "x64", "family": "ubuntu"})
+        self.add("os", {"id": 159, "name": "Custom", "arch": "x64", "family": "iso"})
+        for plan in ("vc2-1c-1gb", "vc2-1c-2gb", "vc2-2c-4gb"):
+            self.add("plans", {"id": plan, "type": "vc2", "locations": ["ams", "fra", "ewr"]})
+        for region in ("ams", "fra", "ewr"):
+            self.add("regions", {"id": region, "city": region, "country": "", "continent": "", "options": []})
+
+        for i in range(ssh_keys):
+            self.add("ssh-keys", {"name": "key-%d" % i, "ssh_key": "ssh-ed25519 AAAA key-%d" % i})
+        for i in range(vpcs):
+            self.add("vpcs", {"description": "vpc-%d" % i, "region": "ams", "v4_subnet": "10.%d.0.0" % i, "v4_subnet_mask": 24})
+        for i in range(firewalls):
+            firewall = self.add("firewalls", {"description": "firewall-%d" % i})
+            for j in range(rules):
+                self.add(
+                    ("firewalls", firewall["id"], "rules"),
+                    {"id": j + 1, "ip_type": "v4", "action": "accept", "protocol": "tcp", "port": str(1000 + j), "subnet": "0.0.0.0", "subnet_size": 0},
+                )
+        for i in range(domains):
+            domain = self.add("domains", {"domain": "example-%d.com" % i, "dns_sec": "disabled"}, id_field="domain")
+            for j in range(records):
+                self.add(
+                    ("domains", domain["domain"], "records"),
+                    {"type": "A", "name": "host-%d" % j, "data": "192.0.2.%d" % (j + 1), "priority": 0, "ttl": 300},
+                )
+
+        for i in range(instances):
+            instance = dict(DEFAULTS["instances"], label="instance-%d" % i, hostname="instance-%d" % i, region="ams", plan="vc2-1c-1gb")
+            instance.update(dict((k, v[1]) for k, v in TRANSITIONS["instances"].items()))
+            self.add("instances", instance)
+        for i in range(bare_metals):
+            bare_metal = dict(DEFAULTS["bare-metals"], label="bare-metal-%d" % i, region="ams", plan="vbm-4c-32gb")
+            bare_metal.update(dict((k, v[1]) for k, v in TRANSITIONS["bare-metals"].items()))
+            self.add("bare-metals", bare_metal)
+        for i in range(snapshots):
+            self.add("snapshots", {"description": "snapshot-%d" % i, "size": 0, "status": "complete"})
+
+    def apply_transitions(self, collection, resource):
+        transitions = TRANSITIONS.get(collection)
+        created = resource.get("_created")
+        if transitions and created and time.time() - created >= self.transition_time:
+            for field, (initial, final) in transitions.items():
+                resource[field] = final
+            del resource["_created"]
+
+    def public(self, collection, resource):
+        self.apply_transitions(collection, resource)
+        return dict((k, v) for k, v in resource.items() if not k.startswith("_"))
+
+    def handle(self, method, path, query, body):
+        """
+        Returns the status, headers and response of a request.
+        """
+        with self.lock:
+            self.requests.append((method, path))
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.rate_limit_ratio and self.random.random() < self.rate_limit_ratio:
+            with self.lock:
+                self.rate_limited += 1
+            return 429, {"Retry-After": "0"}, {"error": "Rate limit exceeded", "status": 429}
+
+        segments = [segment for segment in path.split("/") if segment][1:]  # strip the version
+        if not segments or segments[0] not in COLLECTIONS:
+            return 404, {}, {"error": "Not found", "status": 404}
+
+        with self.lock:
+            if len(segments) <= 2:
+                collection = segments[0]
+                plural, singular, id_field = COLLECTIONS[collection]
+                return self.handle_collection(method, collection, collection, plural, singular, id_field, segments[1:], query, body)
+
+            parent = self.get_collection(segments[0]).get(segments[1])
+            if parent is None:
+                return 404, {}, {"error": "Not found", "status": 404}
+
+            if len(segments) == 3 and segments[2] in SUB_RESOURCES and method == "GET":
+                return 200, {}, SUB_RESOURCES[segments[2]]
+
+            nested = NESTED_COLLECTIONS.get((segments[0], segments[2]))
+            if nested is None:
+                return 404, {}, {"error": "Not found", "status": 404}
+            plural, singular, id_field = nested
+            key = (segments[0], segments[1], segments[2])
+            return self.handle_collection(method, key, segments[2], plural, singular, id_field, segments[3:], query, body)
+
+    def handle_collection(self, method, key, collection, plural, singular, id_field, segments, query, body):
+        resources = self.get_collection(key)
+
+        if not segments:
+            if method == "GET":
+                return 200, {}, self.list(collection, resources, plural, query)
+            if method == "POST":
+                resource = dict(DEFAULTS.get(collection, dict()), **(body or dict()))
+                if collection == "rules":
+                    # Firewall rules have numeric IDs
+                    resource["id"] = max([0] + list(resources)) + 1
+                for field, (initial, final) in TRANSITIONS.get(collection, dict()).items():
+                    resource[field] = initial
+                if collection in TRANSITIONS:
+                    resource["_created"] = time.time()
+                resource = self.add(key, resource, id_field=id_field)
+                status = 201 if collection in ("ssh-keys", "domains", "records", "rules", "vpcs", "firewalls") else 202
+                return status, {}, {singular: self.public(collection, resource)}
+            return 405, {}, {"error": "Method not allowed", "status": 405}
+
+        resource_id = segments[0]
+        if resource_id not in resources and resource_id.isdigit():
+            resource_id = int(resource_id)
+        resource = resources.get(resource_id)
+        if resource is None:
+            return 404, {}, {"error": "Not found", "status": 404}
+
+        if method == "GET":
+            return 200, {}, {singular: self.public(collection, resource)}
+        if method in ("PATCH", "PUT"):
+            resource.update(body or dict())
+            if collection == "instances":
+                return 202, {}, {singular: self.public(collection, resource)}
+            return 204, {}, None
+        if method == "DELETE":
+            del resources[resource_id]
+            return 204, {}, None
+        return 405, {}, {"error": "Method not allowed", "status": 405}
+
+    def list(self, collection, resources, plural, query):
+        per_page = int(query.get("per_page", "100"))
+        offset = decode_cursor(query["cursor"]) if query.get("cursor") else 0
+
+        filters = dict((k, v) for k, v in query.items() if k not in ("per_page", "cursor"))
+        items = [self.public(collection, resource) for resource in resources.values()]
+        if filters:
+            items = [item for item in items if all(str(item.get(k)) == v for k, v in filters.items() if k in item)]
+
+        page = items[offset:offset + per_page]
+        has_next = offset + per_page < len(items)
+        return {
+            plural: page,
+            "meta": {
+                "total": len(items),
+                "links": {
+                    "next": encode_cursor(offset + per_page) if has_next else "",
+                    "prev": encode_cursor(max(0, offset - per_page)) if offset else "",
+                },
+            },
+        }
+
+    def start(self, host="127.0.0.1", port=0):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_request(self):
+                url = urlparse(self.path)
+                query = dict((k, v[0]) for k, v in parse_qs(url.query).items())
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+
+                status, headers, response = stub.handle(self.command, url.path, query, body)
+
+                data = json.dumps(response).encode() if response is not None else b""
+                if self.command == "GET" and status == 200:
+                    headers = dict(headers, ETag='"%s"' % hashlib.sha1(data).hexdigest()[:16])
+                    if self.headers.get("If-None-Match") == headers["ETag"]:
+                        status, data = 304, b""
+
+                accept_encoding = [e.split(";")[0].strip() for e in (self.headers.get("Accept-Encoding") or "").split(",")]
+                for encoding, wbits in (("gzip", 16 + zlib.MAX_WBITS), ("deflate", zlib.MAX_WBITS)):
+                    if data and encoding in accept_encoding:
+                        compressor = zlib.compressobj(6, zlib.DEFLATED, wbits)
+                        data = compressor.compress(data) + compressor.flush()
+                        headers = dict(headers, **{"Content-Encoding": encoding})
+                        break
+
+                with stub.lock:
+                    stub.bytes_sent += len(data)
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = do_request
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return "http://%s:%d/v2" % self.server.server_address
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--instances", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="ratio of requests answered by 429")
+    parser.add_argument("--transition-time", type=float, default=1.0, help="seconds until created resources are ready")
+    args = parser.parse_args()
+
+    stub = VultrApiStub(latency=args.latency, rate_limit_ratio=args.rate_limit_ratio, transition_time=args.transition_time)
+    stub.seed(instances=args.instances)
+    print("Serving %s" % stub.start(host=args.host, port=args.port))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
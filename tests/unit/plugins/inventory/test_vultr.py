@@ -2,8 +2,12 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import errno
+import io
 import json
 import os.path
+import threading
+import zlib
 
 import ansible_collections.vultr.cloud.plugins.inventory.vultr as module_under_test
 import pytest
@@ -11,6 +15,14 @@ from ansible.errors import AnsibleError, AnsibleParserError
 from ansible.inventory.data import InventoryData
 from ansible.parsing.dataloader import DataLoader
 from ansible.template import Templar
+
+try:
+    from ansible.template import trust_as_template
+except ImportError:
+
+    def trust_as_template(template):
+        return template
+
 from ansible_collections.vultr.cloud.plugins.inventory.vultr import \
     InventoryModule
 
@@ -223,3 +235,584 @@ def test_passes_filters_invalid_filter_strict(inventory):
         assert False, "expected _passes_filters() to raise AnsibleError"
     except AnsibleError:
         pass
+
+
+def test_get_instances_rate_limit(inventory, mocker):
+    opts = default_options.copy()
+    opts.update({"api_rate_limit": 10})
+
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+    RequestMock = module_under_test.Request
+
+    req = RequestMock.return_value
+    req.get.side_effect = get_paginated_json_response
+
+    mocker.patch("{0}.VultrRateLimiter".format(module_under_test.__name__))
+    RateLimiterMock = module_under_test.VultrRateLimiter
+
+    inventory._get_instances()
+
+    assert RateLimiterMock.call_args.kwargs["rate"] == 10
+    assert RateLimiterMock.return_value.acquire.call_count == req.get.call_count
+
+
+def test_get_instances_invalid_rate_limit(inventory, mocker):
+    opts = default_options.copy()
+    opts.update({"api_rate_limit": -1})
+
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+
+    with pytest.raises(AnsibleError, match="api_rate_limit must be 0 or greater"):
+        inventory._get_instances()
+
+
+def test_get_instances_multiple_types(inventory, mocker):
+    opts = default_options.copy()
+    opts.update({"instance_type": ["cloud", "bare_metal"]})
+
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+
+    def get_response(url):
+        if "/bare-metals" in url:
+            bare_metals = [dict(instance, label="bm-" + instance["label"]) for instance in json.load(load_fixture("vultr_inventory.json"))]
+            return io.StringIO(json.dumps({"bare_metals": bare_metals, "meta": {"links": {"next": ""}}}))
+        return get_paginated_json_response(url)
+
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+    RequestMock = module_under_test.Request
+
+    req = RequestMock.return_value
+    req.get.side_effect = get_response
+
+    instance_list = inventory._get_instances()
+    assert len(instance_list) == 16
+    assert [i["instance_type"] for i in instance_list] == ["cloud"] * 8 + ["bare_metal"] * 8
+
+    inventory._populate(instance_list)
+    assert inventory.inventory.get_host("windows-guest").vars["vultr_instance_type"] == "cloud"
+    assert inventory.inventory.get_host("bm-windows-guest").vars["vultr_instance_type"] == "bare_metal"
+
+
+def test_get_pages_prefetch(inventory, mocker):
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(default_options))
+    inventory.rate_limiter = None
+
+    next_page_requested = threading.Event()
+
+    def get_response(url):
+        if "&cursor=" in url:
+            next_page_requested.set()
+        return get_paginated_json_response(url)
+
+    inventory.req = mocker.MagicMock()
+    inventory.req.get.side_effect = get_response
+
+    pages = inventory._get_pages("cloud")
+    first_page = next(pages)
+
+    # Next page requested before the first page is processed
+    assert len(first_page) == 5
+    assert next_page_requested.wait(timeout=5)
+
+    assert len(next(pages)) == 3
+    assert list(pages) == []
+
+
+def get_encoded_response(fixture, encoding):
+    with fixture:
+        data = fixture.read().encode()
+
+    if encoding == "gzip":
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    elif encoding == "deflate":
+        compressor = zlib.compressobj(9, zlib.DEFLATED, zlib.MAX_WBITS)
+    else:
+        # Raw deflate stream sent as deflate
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+        encoding = "deflate"
+
+    response = io.BytesIO(compressor.compress(data) + compressor.flush())
+    response.headers = {"content-encoding": encoding}
+    return response
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate", "raw-deflate"])
+def test_get_instances_encoded_response(inventory, mocker, encoding):
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(default_options))
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+    RequestMock = module_under_test.Request
+
+    req = RequestMock.return_value
+    req.get.side_effect = lambda url: get_encoded_response(get_paginated_json_response(url), encoding)
+
+    instance_list = list(inventory._get_instances())
+    assert len(instance_list) == 8
+    assert RequestMock.call_args[1]["headers"]["Accept-Encoding"] == "gzip, deflate"
+
+
+def test_get_instances_decoded_gzip_response(inventory, mocker):
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(default_options))
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+    RequestMock = module_under_test.Request
+
+    def get_response(url):
+        # Decoded by Request already, the header is kept
+        response = io.BytesIO(get_paginated_json_response(url).read().encode())
+        response.headers = {"content-encoding": "gzip"}
+        return response
+
+    req = RequestMock.return_value
+    req.get.side_effect = get_response
+
+    assert len(list(inventory._get_instances())) == 8
+
+
+@pytest.mark.parametrize("results_per_page, expected", [(100, 100), ("250", 250), ("auto", 500)])
+def test_get_resource_pages_results_per_page(inventory, mocker, results_per_page, expected):
+    opts = default_options.copy()
+    opts["api_results_per_page"] = results_per_page
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+    inventory.rate_limiter = None
+    inventory.req = mocker.MagicMock()
+    inventory.req.get.return_value = load_fixture("empty_vultr_inventory.json")
+
+    assert list(inventory._get_pages("cloud")) == [[]]
+    assert inventory.req.get.call_args[0][0] == "https://test.api.vultr.com/v2/instances?per_page={0}".format(expected)
+
+
+@pytest.mark.parametrize("results_per_page", ["many", 0, "-1"])
+def test_get_resource_pages_invalid_results_per_page(inventory, mocker, results_per_page):
+    opts = default_options.copy()
+    opts["api_results_per_page"] = results_per_page
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+
+    with pytest.raises(AnsibleError, match="api_results_per_page must be a positive integer or auto"):
+        list(inventory._get_pages("cloud"))
+
+
+def test_parse_caches_projected_instances(tmp_path, inventory, mocker):
+    inventory_file = tmp_path / "vultr.yaml"
+    inventory_file.write_text("---\nplugin: vultr.cloud.vultr")
+
+    opts = default_options.copy()
+    opts.update(
+        {
+            "attributes": ["id", "plan"],
+            "cache": True,
+            "cache_connection": str(tmp_path / "cache"),
+            "cache_plugin": "jsonfile",
+        }
+    )
+
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+    RequestMock = module_under_test.Request
+
+    req = RequestMock.return_value
+    req.get.side_effect = get_paginated_json_response
+
+    inventory._redirected_names = ["vultr.cloud.vultr", "vultr"]
+    inventory._load_name = "vultr.cloud.vultr"
+    inventory.parse(inventory.inventory, DataLoader(), str(inventory_file))
+
+    cached = inventory._cache[inventory.get_cache_key(str(inventory_file))]
+    assert cached["attributes"] == ["id", "plan"]
+    assert cached["instances"]["fields"] == ["id", "plan", "label", "instance_type"]
+    assert len(cached["instances"]["rows"]) == 8
+
+    assert inventory.inventory.get_host("windows-guest").vars["vultr_plan"] == "vhp-1c-2gb-amd"
+    assert "vultr_main_ip" not in inventory.inventory.get_host("windows-guest").vars
+
+
+def test_load_cached_instances(inventory, instances, mocker):
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(default_options))
+
+    # Raw instances of earlier versions
+    assert inventory._load_cached_instances(instances) == instances
+
+    # Projected to fewer attributes than configured
+    assert inventory._load_cached_instances({"attributes": ["id"], "instances": instances}) is None
+
+    projected = {"attributes": default_options["attributes"], "instances": instances}
+    assert inventory._load_cached_instances(projected) == instances
+
+
+@pytest.mark.parametrize(
+    "host_filter,expected",
+    [
+        ('vultr_plan == "vhp-1c-2gb-amd"', True),
+        ("vultr_plan != 'vhp-1c-2gb-amd'", False),
+        ('"web" in vultr_tags', True),
+        ('"db" in vultr_tags', False),
+        ('"db" not in vultr_tags', True),
+        ("vultr_vcpu_count == 1", True),
+    ],
+)
+def test_passes_filters_fast_path(inventory, mocker, host_filter, expected):
+    variables = {"vultr_plan": "vhp-1c-2gb-amd", "vultr_tags": ["web"], "vultr_vcpu_count": 1}
+    inventory._compose = mocker.MagicMock()
+
+    assert inventory._passes_filters([inventory._compile_filter(host_filter)], variables, "host") is expected
+    assert inventory._compose.call_count == 0
+
+
+@pytest.mark.parametrize(
+    "host_filter",
+    [
+        'vultr_plan | default("") == "vhp-1c-2gb-amd"',
+        'vultr_missing == "vhp-1c-2gb-amd"',
+        '"web" in vultr_none',
+    ],
+)
+def test_passes_filters_fallback(inventory, mocker, host_filter):
+    variables = {"vultr_plan": "vhp-1c-2gb-amd", "vultr_none": None}
+    inventory._compose = mocker.MagicMock(return_value=True)
+
+    assert inventory._passes_filters([inventory._compile_filter(host_filter)], variables, "host") is True
+    assert inventory._compose.call_count == 1
+
+
+@pytest.mark.parametrize("expired", [True, False])
+def test_parse_stale_cache(tmp_path, inventory, instances, mocker, expired):
+    inventory_file = tmp_path / "vultr.yaml"
+    inventory_file.write_text("---\nplugin: vultr.cloud.vultr")
+
+    opts = default_options.copy()
+    opts.update(
+        {
+            "api_cache_dir": str(tmp_path / "stale"),
+            "cache": True,
+            "cache_connection": str(tmp_path / "cache"),
+            "cache_max_staleness": 3600,
+            "cache_plugin": "jsonfile",
+            "cache_timeout": 60,
+        }
+    )
+
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+    RequestMock = module_under_test.Request
+    inventory._refresh_in_background = mocker.MagicMock()
+
+    inventory._redirected_names = ["vultr.cloud.vultr", "vultr"]
+    inventory._load_name = "vultr.cloud.vultr"
+
+    cache_key = inventory.get_cache_key(str(inventory_file))
+    stale_cache = module_under_test.VultrLookupCache(str(tmp_path / "stale" / "inventory"), 3660)
+    stale_cache.set(cache_key, {"attributes": default_options["attributes"], "instances": instances})
+    if expired:
+        mtime = os.stat(stale_cache._get_file_path(cache_key)).st_mtime - 120
+        os.utime(stale_cache._get_file_path(cache_key), (mtime, mtime))
+
+    inventory.parse(inventory.inventory, DataLoader(), str(inventory_file))
+
+    # Served from the stale copy without querying the API
+    assert RequestMock.return_value.get.call_count == 0
+    assert inventory.inventory.get_host("windows-guest").vars["vultr_plan"] == "vhp-1c-2gb-amd"
+    # Only a copy older than cache_timeout is refreshed in the background
+    if expired:
+        assert inventory._refresh_in_background.call_args.args == (str(inventory_file), cache_key, mocker.ANY)
+    else:
+        assert inventory._refresh_in_background.call_count == 0
+
+
+def test_parse_refreshing_stale_cache(tmp_path, inventory, mocker, monkeypatch):
+    inventory_file = tmp_path / "vultr.yaml"
+    inventory_file.write_text("---\nplugin: vultr.cloud.vultr")
+
+    opts = default_options.copy()
+    opts.update(
+        {
+            "api_cache_dir": str(tmp_path / "stale"),
+            "cache": True,
+            "cache_connection": str(tmp_path / "cache"),
+            "cache_max_staleness": 3600,
+            "cache_plugin": "jsonfile",
+            "cache_timeout": 60,
+        }
+    )
+
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+    RequestMock = module_under_test.Request
+
+    req = RequestMock.return_value
+    req.get.side_effect = get_paginated_json_response
+
+    inventory._redirected_names = ["vultr.cloud.vultr", "vultr"]
+    inventory._load_name = "vultr.cloud.vultr"
+    cache_key = inventory.get_cache_key(str(inventory_file))
+    lock_file = tmp_path / "stale" / "inventory" / (cache_key + ".lock")
+    lock_file.parent.mkdir(parents=True)
+    lock_file.write_text(str(os.getpid()))
+    monkeypatch.setenv(inventory.REFRESH_ENV, cache_key)
+
+    inventory.parse(inventory.inventory, DataLoader(), str(inventory_file))
+
+    # Only the stale copy is written and the lock released
+    stale_cache = module_under_test.VultrLookupCache(str(tmp_path / "stale" / "inventory"), 3660)
+    assert len(stale_cache.get(cache_key)["instances"]) == 8
+    assert not (tmp_path / "cache").exists() or not os.listdir(str(tmp_path / "cache"))
+    assert not lock_file.exists()
+
+
+@pytest.mark.parametrize(
+    "pid, age, running",
+    [
+        ("self", 0, True),
+        ("self", 1000, False),
+        ("dead", 0, False),
+        (None, 0, False),
+    ],
+)
+def test_is_refresh_running(tmp_path, inventory, mocker, pid, age, running):
+    lock_file = tmp_path / "refresh.lock"
+    if pid is not None:
+        lock_file.write_text(str(os.getpid()))
+        if age:
+            mtime = os.stat(str(lock_file)).st_mtime - age
+            os.utime(str(lock_file), (mtime, mtime))
+    if pid == "dead":
+        mocker.patch.object(module_under_test.os, "kill", side_effect=OSError(errno.ESRCH, "No such process"))
+    inventory.display = mocker.MagicMock()
+
+    assert inventory._is_refresh_running(str(lock_file), "refresh.log") is running
+    # Failed and hung refreshes are reported
+    assert inventory.display.warning.call_count == int(pid is not None and not running)
+
+
+def test_parse_stores_stale_cache(tmp_path, inventory, mocker):
+    inventory_file = tmp_path / "vultr.yaml"
+    inventory_file.write_text("---\nplugin: vultr.cloud.vultr")
+
+    opts = default_options.copy()
+    opts.update(
+        {
+            "api_cache_dir": str(tmp_path / "stale"),
+            "cache": True,
+            "cache_connection": str(tmp_path / "cache"),
+            "cache_max_staleness": 3600,
+            "cache_plugin": "jsonfile",
+            "cache_timeout": 60,
+        }
+    )
+
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+    RequestMock = module_under_test.Request
+
+    req = RequestMock.return_value
+    req.get.side_effect = get_paginated_json_response
+
+    inventory._redirected_names = ["vultr.cloud.vultr", "vultr"]
+    inventory._load_name = "vultr.cloud.vultr"
+    inventory.parse(inventory.inventory, DataLoader(), str(inventory_file))
+
+    cache_key = inventory.get_cache_key(str(inventory_file))
+    stale_cache = module_under_test.VultrLookupCache(str(tmp_path / "stale" / "inventory"), 3660)
+    assert len(stale_cache.get(cache_key)["instances"]) == 8
+
+
+def test_populate_incremental(inventory, instances, mocker):
+    opts = default_options.copy()
+    opts.update(
+        {
+            "compose": {"ansible_host": trust_as_template("vultr_main_ip")},
+            "filters": ['vultr_region != "ewr"'],
+            "keyed_groups": [{"key": trust_as_template("vultr_plan"), "prefix": "plan", "parent_group": "plans"}],
+        }
+    )
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+
+    host_states = {}
+    inventory._populate(instances, host_states, {})
+    # All but the instance without label
+    assert len(host_states) == len(instances) - 1
+
+    expected_hosts = dict((name, (host.vars, sorted(g.name for g in host.get_groups()))) for name, host in inventory.inventory.hosts.items())
+
+    changed = [dict(instance) for instance in instances]
+    changed[1]["plan"] = "vc2-2c-4gb"
+
+    inventory.inventory = InventoryData()
+    mocker.spy(inventory, "_set_composite_vars")
+    next_host_states = {}
+    inventory._populate(changed, next_host_states, host_states)
+
+    # Only the changed instance was computed again
+    assert inventory._set_composite_vars.call_count == 1
+    assert next_host_states[changed[1]["id"]]["fingerprint"] != host_states[changed[1]["id"]]["fingerprint"]
+
+    changed_host = inventory.inventory.get_host(changed[1]["label"])
+    assert changed_host.vars["vultr_plan"] == "vc2-2c-4gb"
+    assert "plan_vc2_2c_4gb" in [g.name for g in changed_host.get_groups()]
+
+    for name, (host_vars, groups) in expected_hosts.items():
+        if name == changed[1]["label"]:
+            continue
+        host = inventory.inventory.get_host(name)
+        assert host.vars == host_vars
+        assert sorted(g.name for g in host.get_groups()) == groups
+
+    assert "plans" in [g.name for g in inventory.inventory.groups["plan_vhp_1c_2gb_amd"].parent_groups]
+
+
+def test_get_instances_multiple_accounts(inventory, mocker):
+    opts = default_options.copy()
+    opts.update(
+        {
+            "accounts": [
+                {"name": "production"},
+                {"name": "staging", "api_key": "TEST_VULTR_API_KEY_STAGING", "group": "stage"},
+                {"name": "testing", "api_key": "TEST_VULTR_API_KEY_TESTING", "host_prefix": "test-"},
+            ],
+            "accounts_parallelism": 2,
+        }
+    )
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+    RequestMock = module_under_test.Request
+
+    req = RequestMock.return_value
+    req.get.side_effect = get_paginated_json_response
+
+    instance_list = inventory._get_instances()
+    assert len(instance_list) == 24
+    assert [i["account"] for i in instance_list] == ["production"] * 8 + ["staging"] * 8 + ["testing"] * 8
+
+    api_keys = sorted(call.kwargs["headers"]["Authorization"] for call in RequestMock.call_args_list)
+    assert api_keys == [
+        "Bearer TEST_VULTR_API_KEY",
+        "Bearer TEST_VULTR_API_KEY_STAGING",
+        "Bearer TEST_VULTR_API_KEY_TESTING",
+    ]
+
+    inventory._populate(instance_list)
+
+    production_host = inventory.inventory.get_host("windows-guest")
+    assert production_host.vars["vultr_account"] == "production"
+    assert "production" in [g.name for g in production_host.get_groups()]
+
+    # Deduplicated hostname of the same label in another account
+    staging_host = inventory.inventory.get_host("windows-guest_staging")
+    assert staging_host.vars["vultr_account"] == "staging"
+    assert "stage" in [g.name for g in staging_host.get_groups()]
+
+    testing_host = inventory.inventory.get_host("test-windows-guest")
+    assert testing_host.vars["vultr_account"] == "testing"
+    assert len(inventory.inventory.hosts) == 21
+
+
+def test_get_instances_account_without_name(inventory, mocker):
+    opts = default_options.copy()
+    opts.update({"accounts": [{"api_key": "TEST_VULTR_API_KEY"}]})
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+
+    with pytest.raises(AnsibleParserError):
+        inventory._get_instances()
+
+
+def test_get_instances_enrichments(inventory, mocker):
+    opts = default_options.copy()
+    opts.update({"enrichments": ["blocks", "firewall_group", "vpcs", "vpc2s"]})
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+
+    debian_id = "30c17c34-223f-436e-acbe-393af5293adb"
+    windows_id = "2db0bb8c-9d83-4e62-86ef-b3d999960d72"
+    responses = {
+        "/blocks": {
+            "blocks": [
+                {"id": "block-1", "attached_to_instance": debian_id},
+                {"id": "block-2", "attached_to_instance": debian_id},
+                {"id": "block-3", "attached_to_instance": ""},
+            ]
+        },
+        "/firewalls": {"firewall_groups": [{"id": "fw-1", "description": "web"}]},
+        "/vpcs": {
+            "vpcs": [
+                {"id": "vpc-1", "v4_subnet": "10.1.96.0", "v4_subnet_mask": 20},
+                {"id": "vpc-2", "v4_subnet": "10.3.96.0", "v4_subnet_mask": 20},
+            ]
+        },
+        "/vpc2/vpc2-1/nodes": {"nodes": [{"id": windows_id, "ip_address": "10.4.0.3"}]},
+        "/vpc2": {"vpcs": [{"id": "vpc2-1", "description": "private"}]},
+    }
+
+    def get_response(url):
+        for path, response in responses.items():
+            if "{0}?".format(path) in url:
+                response = dict(response, meta={"links": {"next": ""}})
+                return io.StringIO(json.dumps(response))
+
+        page = json.load(get_paginated_json_response(url))
+        for instance in page["instances"]:
+            if instance["id"] == windows_id:
+                instance["firewall_group_id"] = "fw-1"
+        return io.StringIO(json.dumps(page))
+
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+    RequestMock = module_under_test.Request
+
+    req = RequestMock.return_value
+    req.get.side_effect = get_response
+
+    instance_list = inventory._get_instances()
+
+    # Instances queried on two pages, each source once
+    assert req.get.call_count == 2 + 5
+
+    inventory._populate(instance_list)
+
+    debian_host = inventory.inventory.get_host("debian-guest")
+    assert [block["id"] for block in debian_host.vars["vultr_blocks"]] == ["block-1", "block-2"]
+    assert debian_host.vars["vultr_firewall_group"] is None
+    assert [vpc["id"] for vpc in debian_host.vars["vultr_vpcs"]] == ["vpc-1"]
+    assert debian_host.vars["vultr_vpc2s"] == []
+
+    windows_host = inventory.inventory.get_host("windows-guest")
+    assert windows_host.vars["vultr_blocks"] == []
+    assert windows_host.vars["vultr_firewall_group"]["description"] == "web"
+    assert windows_host.vars["vultr_vpcs"] == []
+    assert windows_host.vars["vultr_vpc2s"] == [{"id": "vpc2-1", "description": "private", "ip_address": "10.4.0.3"}]
+
+
+@pytest.mark.parametrize("compression", [True, False])
+def test_parse_cached_records(tmp_path, inventory, mocker, compression):
+    inventory_file = tmp_path / "vultr.yaml"
+    inventory_file.write_text("---\nplugin: vultr.cloud.vultr")
+
+    opts = default_options.copy()
+    opts.update(
+        {
+            "cache": True,
+            "cache_compression": compression,
+            "cache_connection": str(tmp_path / "cache"),
+            "cache_plugin": "jsonfile",
+        }
+    )
+
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+    mocker.patch("{0}.Request".format(module_under_test.__name__))
+    RequestMock = module_under_test.Request
+
+    req = RequestMock.return_value
+    req.get.side_effect = get_paginated_json_response
+
+    inventory._redirected_names = ["vultr.cloud.vultr", "vultr"]
+    inventory._load_name = "vultr.cloud.vultr"
+    inventory.parse(inventory.inventory, DataLoader(), str(inventory_file))
+    expected_hosts = dict((name, host.vars) for name, host in inventory.inventory.hosts.items())
+
+    cached = inventory._cache[inventory.get_cache_key(str(inventory_file))]
+    assert ("compressed_rows" in cached["instances"]) is compression
+    inventory.update_cache_if_changed()
+
+    # Populated from the cache
+    inventory.inventory = InventoryData()
+    inventory.parse(inventory.inventory, DataLoader(), str(inventory_file))
+    assert req.get.call_count == 2
+    assert dict((name, host.vars) for name, host in inventory.inventory.hosts.items()) == expected_hosts
@@ -0,0 +1,242 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import socket
+
+import ansible_collections.vultr.cloud.plugins.module_utils.vultr_v2 as module_under_test
+import pytest
+from ansible_collections.vultr.cloud.plugins.module_utils.vultr_v2 import (
+    AnsibleVultr, VultrConnectionError, VultrConnectionPool, VultrResponseMemo,
+    vultr_argument_spec)
+
+API_ENDPOINT = "https://test.api.vultr.com/v2"
+
+
+def get_params(**kwargs):
+    params = dict((k, v.get("default")) for k, v in vultr_argument_spec().items())
+    params.update(api_key="TEST_VULTR_API_KEY", api_endpoint=API_ENDPOINT)
+    params.update(kwargs)
+    return params
+
+
+def get_module(mocker, **kwargs):
+    module = mocker.MagicMock()
+    module.params = get_params(**kwargs)
+    module.jsonify.side_effect = json.dumps
+    module.from_json.side_effect = json.loads
+    module.fail_json.side_effect = SystemExit
+    return module
+
+
+def get_response(body, status=200):
+    return json.dumps(body).encode(), dict(status=status)
+
+
+def get_vultr(module):
+    return AnsibleVultr(
+        module=module,
+        namespace="vultr_instance",
+        resource_path="/instances",
+        resource_result_key_singular="instance",
+    )
+
+
+@pytest.fixture()
+def memo(mocker):
+    memo = VultrResponseMemo()
+    mocker.patch.object(module_under_test, "RESPONSE_MEMO", memo)
+    return memo
+
+
+@pytest.fixture()
+def vultr(mocker, memo):
+    vultr = get_vultr(get_module(mocker))
+    vultr.fetch = mocker.MagicMock()
+    return vultr
+
+
+@pytest.mark.parametrize("results_per_page, expected", [(100, 100), ("250", 250), ("auto", "auto")])
+def test_api_results_per_page(mocker, results_per_page, expected):
+    assert get_vultr(get_module(mocker, api_results_per_page=results_per_page)).module.params["api_results_per_page"] == expected
+
+
+@pytest.mark.parametrize("results_per_page", ["many", 0, -1, "-5", None])
+def test_api_results_per_page_invalid(mocker, results_per_page):
+    module = get_module(mocker, api_results_per_page=results_per_page)
+
+    with pytest.raises(SystemExit):
+        get_vultr(module)
+    assert module.fail_json.call_args.kwargs["msg"] == "api_results_per_page must be a positive integer or auto, got: %s" % results_per_page
+
+
+@pytest.mark.parametrize("rate, limited", [(0, False), (None, False), (2.5, True)])
+def test_api_rate_limit(mocker, rate, limited):
+    mocker.patch.object(module_under_test, "VultrRateLimiter")
+
+    assert (get_vultr(get_module(mocker, api_rate_limit=rate)).rate_limiter is not None) is limited
+
+
+def test_api_rate_limit_negative(mocker):
+    module = get_module(mocker, api_rate_limit=-1)
+
+    with pytest.raises(SystemExit):
+        get_vultr(module)
+    assert module.fail_json.call_args.kwargs["msg"] == "api_rate_limit must be 0 or greater, got: -1"
+
+
+def test_response_memo_store():
+    memo = VultrResponseMemo()
+    memo.store(API_ENDPOINT + "/instances/1", b"{}")
+    assert memo.get(API_ENDPOINT + "/instances/1") == b"{}"
+    assert memo.get(API_ENDPOINT + "/instances/2") is None
+
+
+def test_response_memo_store_max_entries(mocker):
+    memo = VultrResponseMemo()
+    mocker.patch.object(memo, "MAX_ENTRIES", 2)
+    for resource_id in range(3):
+        memo.store(API_ENDPOINT + "/instances/%s" % resource_id, b"{}")
+    assert memo.get(API_ENDPOINT + "/instances/0") is None
+    assert memo.get(API_ENDPOINT + "/instances/2") == b"{}"
+
+
+@pytest.mark.parametrize(
+    "changed_path, dropped, kept",
+    [
+        ("/instances/1", ["/instances/1", "/instances/1/user-data"], ["/instances/10", "/ssh-keys/1"]),
+        ("/instances/1/start", ["/instances/1"], ["/instances/1/user-data", "/instances/2"]),
+        ("/instances", ["/instances/1", "/instances/1/user-data", "/instances/10"], ["/ssh-keys/1"]),
+    ],
+)
+def test_response_memo_invalidate(changed_path, dropped, kept):
+    memo = VultrResponseMemo()
+    for path in ("/instances/1", "/instances/1/user-data", "/instances/10", "/instances/2", "/ssh-keys/1"):
+        memo.store(API_ENDPOINT + path, b"{}")
+
+    memo.invalidate(API_ENDPOINT + changed_path + "?force=true")
+
+    for path in dropped:
+        assert memo.get(API_ENDPOINT + path) is None
+    for path in kept:
+        assert memo.get(API_ENDPOINT + path) == b"{}"
+
+
+def test_api_query_memoizes_single_resources(vultr):
+    vultr.fetch.return_value = get_response({"instance": {"id": "1"}})
+
+    assert vultr.query_by_id("1") == {"id": "1"}
+    # Callers may modify the result
+    vultr.query_by_id("1")["label"] = "changed"
+    assert vultr.query_by_id("1") == {"id": "1"}
+
+    assert vultr.fetch.call_count == 1
+    assert vultr.metrics.summary["memoized"] == 2
+
+
+def test_api_query_not_memoizing_lists(vultr, memo):
+    vultr.fetch.return_value = get_response({"instances": [{"id": "1"}], "meta": {"links": {"next": ""}}})
+
+    assert vultr.query_list() == [{"id": "1"}]
+    assert vultr.query_list() == [{"id": "1"}]
+
+    assert vultr.fetch.call_count == 2
+    assert memo.get(API_ENDPOINT + "/instances") is None
+
+
+def test_api_query_invalidates_on_change(vultr):
+    vultr.fetch.return_value = get_response({"instance": {"id": "1"}})
+    vultr.query_by_id("1")
+
+    vultr.fetch.return_value = get_response(None, status=204)
+    vultr.api_query("/instances/1", method="PATCH", data={"label": "changed"})
+
+    vultr.fetch.return_value = get_response({"instance": {"id": "1", "label": "changed"}})
+    assert vultr.query_by_id("1") == {"id": "1", "label": "changed"}
+    assert vultr.fetch.call_count == 3
+
+
+def test_api_query_polling_bypass(vultr, mocker):
+    mocker.patch.object(module_under_test, "poll", side_effect=lambda timeout, hint: iter(range(2)))
+    vultr.fetch.return_value = get_response({"instance": {"id": "1", "status": "pending"}})
+    vultr.query_by_id("1")
+
+    vultr.fetch.side_effect = [
+        get_response({"instance": {"id": "1", "status": "pending"}}),
+        get_response({"instance": {"id": "1", "status": "active"}}),
+    ]
+    for dummy in vultr.poll(timeout=10):
+        if vultr.query_by_id("1")["status"] == "active":
+            break
+
+    assert vultr.fetch.call_count == 3
+    assert vultr._polling == 0
+
+    # The polled response is kept
+    assert vultr.query_by_id("1")["status"] == "active"
+    assert vultr.fetch.call_count == 3
+
+
+def get_connection(mocker, body=b"{}", error=None):
+    conn = mocker.MagicMock()
+    resp = conn.getresponse.return_value
+    resp.read.side_effect = [body, b""]
+    resp.getheader.return_value = None
+    resp.getheaders.return_value = [("Content-Type", "application/json")]
+    resp.status = 200
+    resp.reason = "OK"
+    resp.will_close = False
+    if error is not None:
+        conn.getresponse.side_effect = error
+    return conn
+
+
+def test_connection_pool_reuse_sets_timeout(mocker):
+    pool = VultrConnectionPool()
+    conn = get_connection(mocker)
+    pool.release(("https", "test.api.vultr.com", True), conn)
+
+    assert pool.acquire(("https", "test.api.vultr.com", True), 30, True) == (conn, True)
+    conn.sock.settimeout.assert_called_once_with(30)
+
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_connection_pool_retries_stale_connection(mocker, method):
+    pool = VultrConnectionPool()
+    stale = get_connection(mocker, error=module_under_test.REMOTE_DISCONNECTED("closed"))
+    pool.release(("https", "test.api.vultr.com", True), stale)
+    fresh = get_connection(mocker)
+    mocker.patch.object(pool, "_connect", return_value=fresh)
+
+    status, reason, headers, body, size = pool.request(API_ENDPOINT + "/ssh-keys", method, "{}", None, 30, True)
+
+    assert (status, body, headers["content-type"]) == (200, b"{}", "application/json")
+    assert stale.close.call_count == 1
+    assert fresh.request.call_count == 1
+    # The fresh connection is kept for reuse
+    assert pool.acquire(("https", "test.api.vultr.com", True), 30, True) == (fresh, True)
+
+
+def test_connection_pool_not_resending_sent_request(mocker):
+    pool = VultrConnectionPool()
+    conn = get_connection(mocker, error=socket.timeout("timed out"))
+    pool.release(("https", "test.api.vultr.com", True), conn)
+    mocker.patch.object(pool, "_connect")
+
+    with pytest.raises(VultrConnectionError) as e:
+        pool.request(API_ENDPOINT + "/ssh-keys", "POST", "{}", None, 30, True)
+
+    assert e.value.sent is True
+    assert e.value.stale is False
+    assert pool._connect.call_count == 0
+
+
+def test_fetch_not_resending_sent_request(vultr, mocker):
+    mocker.patch.object(module_under_test.CONNECTION_POOL, "request", side_effect=VultrConnectionError(socket.timeout("timed out"), sent=True))
+    mocker.patch.object(module_under_test, "fetch_url")
+
+    body, info = vultr._fetch(API_ENDPOINT + "/instances", "POST", "{}", dict(), 30)
+
+    assert info["status"] == -1
+    assert module_under_test.fetch_url.call_count == 0
@@ -0,0 +1,161 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+import ansible_collections.vultr.cloud.plugins.module_utils.vultr_v2 as vultr_v2
+import pytest
+from ansible_collections.vultr.cloud.plugins.module_utils.vultr_v2 import (
+    AnsibleVultr, VultrResponseMemo, vultr_argument_spec)
+from ansible_collections.vultr.cloud.plugins.modules.instances import \
+    AnsibleVultrInstances
+
+API_ENDPOINT = "https://test.api.vultr.com/v2"
+
+OS_LIST = {"os": [{"id": 2136, "name": "Debian 12 x64 (bookworm)"}], "meta": {"links": {"next": ""}}}
+
+
+def get_instance(**kwargs):
+    instance = {
+        "id": "cb676a46-66fd-4dfb-b839-443f2e6c0b60",
+        "label": "web1",
+        "region": "ams",
+        "plan": "vc2-1c-1gb",
+        "os_id": 2136,
+        "tags": [],
+        "features": [],
+        "status": "active",
+        "server_status": "ok",
+        "power_status": "running",
+    }
+    instance.update(kwargs)
+    return instance
+
+
+def get_module(mocker, instances, **kwargs):
+    params = dict((k, v.get("default")) for k, v in vultr_argument_spec().items())
+    params.update(
+        api_key="TEST_VULTR_API_KEY",
+        api_endpoint=API_ENDPOINT,
+        instances=instances,
+        parallelism=10,
+        skip_wait=True,
+        wait_timeout=60,
+        state="present",
+    )
+    params.update(kwargs)
+
+    module = mocker.MagicMock()
+    module.params = params
+    module.check_mode = False
+    module.jsonify.side_effect = json.dumps
+    module.from_json.side_effect = json.loads
+    module.fail_json.side_effect = SystemExit
+    return module
+
+
+def get_spec(**kwargs):
+    spec = dict((k, None) for k in ("hostname", "app", "image", "snapshot", "plan", "ddos_protection", "backups", "enable_ipv6"))
+    spec.update(
+        dict((k, None) for k in ("tags", "vpcs", "reserved_ipv4", "firewall_group", "startup_script", "user_data", "ssh_keys", "user_scheme"))
+    )
+    spec.update(label="web1", region="ams", os="Debian 12 x64 (bookworm)", activation_email=False)
+    spec.update(kwargs)
+    return spec
+
+
+@pytest.fixture()
+def api(mocker):
+    """
+    Fake API, responses by (method, path), a list of responses is returned one by one.
+    """
+    mocker.patch.object(vultr_v2, "RESPONSE_MEMO", VultrResponseMemo())
+    mocker.patch.object(vultr_v2, "poll", side_effect=lambda timeout, hint=None: iter(range(3)))
+
+    routes = dict()
+    calls = list()
+
+    def fetch(url, method="GET", data=None, headers=None):
+        path = url[len(API_ENDPOINT):].split("?")[0]
+        calls.append((method, path))
+        body = routes[(method, path)]
+        if isinstance(body, list):
+            body = body.pop(0)
+        return json.dumps(body).encode(), dict(status=200 if body is not None else 204)
+
+    mocker.patch.object(AnsibleVultr, "fetch", side_effect=fetch)
+    routes[("GET", "/os")] = OS_LIST
+    return routes, calls
+
+
+def test_spec_update_waits_for_instance_job(mocker, api):
+    routes, calls = api
+    instance = get_instance()
+    routes[("GET", "/instances/%s/user-data" % instance["id"])] = {"user_data": {"data": ""}}
+    routes[("PATCH", "/instances/%s" % instance["id"])] = {"instance": instance, "job_ids": ["job-1"]}
+    routes[("GET", "/instances/jobs/job-1")] = [{"state": "processing"}, {"state": "processing"}, {"state": "success"}]
+    routes[("GET", "/instances/%s" % instance["id"])] = {"instance": get_instance(plan="vc2-2c-4gb")}
+
+    vultr = AnsibleVultrInstances(
+        module=get_module(mocker, [get_spec(plan="vc2-2c-4gb")]),
+        namespace="vultr_instances",
+        resource_path="/instances",
+        resource_result_key_singular="instance",
+        resource_key_name="label",
+    )
+    spec = vultr.specs[0]
+    resource = vultr.spec_update(spec, instance)
+
+    assert resource["plan"] == "vc2-2c-4gb"
+    assert spec.result["changed"] is True
+    assert spec.result["diff"]["before"]["plan"] == "vc2-1c-1gb"
+    assert spec.result["diff"]["after"]["plan"] == "vc2-2c-4gb"
+    # The instance is queried after the job succeeded
+    assert calls.count(("GET", "/instances/jobs/job-1")) == 3
+    assert calls[-1] == ("GET", "/instances/%s" % instance["id"])
+
+
+def test_spec_update_unchanged(mocker, api):
+    routes, calls = api
+    instance = get_instance(tags=["web"])
+    routes[("GET", "/instances/%s/user-data" % instance["id"])] = {"user_data": {"data": ""}}
+
+    vultr = AnsibleVultrInstances(
+        module=get_module(mocker, [get_spec(plan="vc2-1c-1gb", tags=["web"])]),
+        namespace="vultr_instances",
+        resource_path="/instances",
+        resource_result_key_singular="instance",
+        resource_key_name="label",
+    )
+    spec = vultr.specs[0]
+    vultr.spec_update(spec, instance)
+
+    assert spec.result["changed"] is False
+    assert not any(method == "PATCH" for method, path in calls)
+
+
+def test_specs_share_lookup_lists(mocker, api):
+    routes, calls = api
+
+    vultr = AnsibleVultrInstances(
+        module=get_module(mocker, [get_spec(label="web1"), get_spec(label="web2"), get_spec(label="web3")]),
+        namespace="vultr_instances",
+        resource_path="/instances",
+        resource_result_key_singular="instance",
+        resource_key_name="label",
+    )
+
+    assert [spec.module.params["os_id"] for spec in vultr.specs] == [2136, 2136, 2136]
+    assert calls.count(("GET", "/os")) == 1
+
+
+def test_specs_duplicate_label(mocker, api):
+    with pytest.raises(SystemExit):
+        AnsibleVultrInstances(
+            module=get_module(mocker, [get_spec(), get_spec()]),
+            namespace="vultr_instances",
+            resource_path="/instances",
+            resource_result_key_singular="instance",
+            resource_key_name="label",
+        )